@@ -13,3 +13,23 @@ def test_pair_connection():
     dict_data = {"test_data": True}
     client.send_dict(dict_data)
     assert dict_data == server.recv_dict()
+
+
+def test_array_roundtrip():
+
+    # Initialize the client
+    client = PairClient(address=f"tcp://127.0.0.1:5556")
+
+    # Initialize the server
+    server = PairServer(f'tcp://*:5556')
+
+    args = {"frame_index": 0}
+    data = np.arange(24, dtype=np.uint8).reshape(2, 3, 4)
+
+    # Send twice to also cover the cached meta header path
+    for _ in range(2):
+        client.send_array(args, data)
+        recv_args, recv_data = server.recv_array()
+        assert recv_args == args
+        assert recv_data.dtype == data.dtype
+        assert np.array_equal(recv_data, data)
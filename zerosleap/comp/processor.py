@@ -16,12 +16,36 @@ will make the actual processing.
 """
 import sys
 from abc import ABC, abstractmethod
+from multiprocessing import shared_memory
+from multiprocessing.sharedctypes import RawArray
 from typing import Dict, List, Union
 import numpy as np
 import os.path
 
-from zerosleap.comp.server import VideoProcessingServer, TrackProcessingServer, ProcessingServer
-from zerosleap.conn.pair import PairClient
+from zerosleap.comp.server import VideoProcessingServer, TrackProcessingServer, ProcessingServer, \
+    METRIC_ITERATION, METRIC_OVERALL_TIME, METRIC_RECV_TIME, METRIC_SEND_TIME, METRIC_COMP_TIME, METRIC_COUNT
+from zerosleap.conn.pair import PairClient, ipc_address
+
+# Numba is optional, when it is available the peak grouping runs
+# as a jitted counting loop instead of the numpy fallback.
+try:
+    from numba import njit
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    _NUMBA_AVAILABLE = False
+
+
+if _NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _group_offsets(frame_idx: np.ndarray, n_frames: int) -> np.ndarray:
+        """
+        Builds CSR style group offsets for sorted frame indices.
+        offsets[i]:offsets[i+1] slices the points of frame i.
+        """
+        offsets = np.zeros(n_frames + 1, dtype=np.int64)
+        for idx in frame_idx:
+            offsets[idx + 1] += 1
+        return np.cumsum(offsets)
 
 
 class Processor(ABC):
@@ -65,19 +89,34 @@ class VideoProcessor(Processor):
         # The model should be inside of the resources folder
         model_path = os.path.join(current_path, "../resources/keras_model.h5")
 
+        # Shared metrics array, the server writes its counters into
+        # it and we read them directly without any message traffic
+        self._server_metrics = RawArray('d', METRIC_COUNT)
+
         # Initialize VideoProcessingServer with model. The model path
         # should be accessible from server side. Don't have any access
         # to server object from client side just managing its lifecycle.
-        self._server = VideoProcessingServer(model_path, port=port)
+        self._server = VideoProcessingServer(model_path, port=port, metrics=self._server_metrics)
         self._server.start()
-        self._server_metrics = {}
 
-        # Initialize the client with a PairClient object
-        self._client = PairClient(address=f"tcp://127.0.0.1:{port}")
+        # Initialize the client with a PairClient object.
+        # The server is a local process so the pair runs over ipc.
+        self._client = PairClient(address=ipc_address(port))
 
         # Used to check processor status, send/recv mode.
         self._send_flag = False
 
+        # Reusable buffer for stacking frame batches
+        self._batch_buf = None
+
+        # Batch length of the request in flight, recv groups the
+        # returned peaks into exactly this many frames
+        self._batch_len = 0
+
+        # Ring of shared memory chunk buffers, see chunk_buffers
+        self._shm_ring = []
+        self._shm_views = []
+
     def send(self, data: np.ndarray, peaks=True, heatmaps=False):
         """
         Sends image or chunk of images to the server with
@@ -90,14 +129,96 @@ class VideoProcessor(Processor):
         """
 
         args = {"peaks": peaks,
-                "heatmaps": heatmaps,
-                "metrics": True}
+                "heatmaps": heatmaps}
 
+        # A single frame [width, height, channel] gains the batch
+        # dimension here, a stride-only reshape without copy
+        if data.ndim == 3:
+            data = data[np.newaxis]
+
+        self._batch_len = data.shape[0]
         self._client.send_array(args, data)
 
         # Set _send_flag to True for synchronization
         self._send_flag = True
 
+    def send_batched(self, frames: List[np.ndarray], peaks=True, heatmaps=False):
+        """
+        Stacks a list of frames into a reusable batch buffer and
+        sends them as one request. Batching amortizes the ZMQ
+        round-trip and the inference dispatch overhead over the
+        whole batch.
+
+        Args:
+            frames: List of frames as numpy arrays [width, height, channel]
+            peaks: request for peak
+            heatmaps: request for heatmaps
+        """
+        shape = (len(frames),) + frames[0].shape
+        if self._batch_buf is None or self._batch_buf.shape != shape:
+            self._batch_buf = np.empty(shape, dtype=frames[0].dtype)
+        np.stack(frames, axis=0, out=self._batch_buf)
+
+        self.send(self._batch_buf, peaks=peaks, heatmaps=heatmaps)
+
+    def chunk_buffers(self, shape: tuple, dtype=np.uint8) -> List[np.ndarray]:
+        """
+        Returns two chunk buffers backed by shared memory blocks.
+        Frames written into them are visible to the server process
+        directly, so a chunk sent with send_shm crosses the process
+        boundary without the payload ever touching the socket.
+
+        Args:
+            shape: Chunk shape [n, width, height, channel]
+            dtype: Chunk dtype
+
+        Returns:
+            List of ndarray views over the shared memory ring
+        """
+        if not self._shm_views or self._shm_views[0].shape != shape or \
+                self._shm_views[0].dtype != dtype:
+            self._release_shm()
+            nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            self._shm_ring = [shared_memory.SharedMemory(create=True, size=nbytes)
+                              for _ in range(2)]
+            self._shm_views = [np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+                               for shm in self._shm_ring]
+        return self._shm_views
+
+    def send_shm(self, index: int, length: int, peaks=True, heatmaps=False):
+        """
+        Sends a processing request whose payload lives in the shared
+        memory ring. Only the buffer descriptor crosses the socket,
+        the server maps the block and reads the frames in place.
+
+        Args:
+            index: Ring index of the filled chunk buffer
+            length: Number of valid frames in the buffer
+            peaks: request for peak
+            heatmaps: request for heatmaps
+        """
+        view = self._shm_views[index]
+        args = {"peaks": peaks,
+                "heatmaps": heatmaps,
+                "shm": {"name": self._shm_ring[index].name,
+                        "shape": (length,) + view.shape[1:],
+                        "dtype": str(view.dtype)}}
+
+        self._batch_len = length
+        # Placeholder payload, the frames stay in shared memory
+        self._client.send_array(args, np.empty(0, dtype=np.uint8))
+
+        # Set _send_flag to True for synchronization
+        self._send_flag = True
+
+    def _release_shm(self):
+        """Closes and unlinks the shared memory ring."""
+        for shm in self._shm_ring:
+            shm.close()
+            shm.unlink()
+        self._shm_ring = []
+        self._shm_views = []
+
     def recv(self) -> Union[Dict, None]:
         """
         Receive processed images data.
@@ -107,7 +228,6 @@ class VideoProcessor(Processor):
             Dict:
                 "peaks" : []
                 "heatmaps" : []
-                "metrics" : []
         """
         # If _send_flag is not set return None
         if not self._send_flag:
@@ -119,23 +239,34 @@ class VideoProcessor(Processor):
         if "peaks" in result:
             peaks = result["peaks"]
 
-            # Convert peak points to points list for each frame.
-            # Cause of only serialized data types can be used for
-            # communication and to separating data processing and
-            # data manipulation functions data manipulations should be
-            # in client side.
-            peak_points = [None] * len(set(peaks["frame_idx"]))
-            for i, idx in enumerate(peaks["frame_idx"]):
-                if peak_points[idx] is None:
-                    peak_points[idx] = []
-                peak_points[idx].append(peaks["points"][i])
+            # Group peak points by frame index. The frame indices
+            # arrive already sorted (tf.where emits elements in
+            # row-major order), so one searchsorted + split produces
+            # the per frame point arrays without a Python loop over
+            # every peak. The grouping always yields one contiguous
+            # [n, 2] array per frame of the sent batch, frames
+            # without peaks get an empty row view.
+            frame_idx = peaks["frame_idx"]
+            points = peaks["points"]
+            n_frames = self._batch_len
+            if frame_idx.size > 0:
+                if _NUMBA_AVAILABLE:
+                    # Jitted counting loop producing CSR style
+                    # offsets, the groups are views over the
+                    # received points buffer
+                    offsets = _group_offsets(frame_idx, n_frames)
+                    peak_points = [points[offsets[i]:offsets[i + 1]]
+                                   for i in range(n_frames)]
+                else:
+                    splits = np.searchsorted(frame_idx, np.arange(1, n_frames))
+                    peak_points = np.split(points, splits)
+            else:
+                peak_points = [points[0:0]] * n_frames
             output["peaks"] = peak_points
 
         if "heatmaps" in result:
-            output["heatmaps"] = np.asarray(result["heatmaps"])
-
-        # Update server metrics
-        self._server_metrics = result["metrics"]
+            # Heatmaps already arrive as np.ndarray
+            output["heatmaps"] = result["heatmaps"]
 
         # Set _send_flag as False
         self._send_flag = False
@@ -153,10 +284,15 @@ class VideoProcessor(Processor):
                 ["send"]: Sending time mean
                 ["load"]: Computation Time / Overall Time
         """
-        output = {"recv": self._server_metrics["recv_time"] / self._server_metrics["iteration"],
-                  "comp": self._server_metrics["comp_time"] / self._server_metrics["iteration"],
-                  "send": self._server_metrics["send_time"] / self._server_metrics["iteration"],
-                  "load": self._server_metrics["comp_time"] / self._server_metrics["overall_time"]}
+        # Read the shared metrics array written by the server,
+        # guard against the server not being built yet. Times are
+        # stored in nanoseconds, converted to seconds on read.
+        iteration = self._server_metrics[METRIC_ITERATION] or 1
+        overall = self._server_metrics[METRIC_OVERALL_TIME] or 1
+        output = {"recv": self._server_metrics[METRIC_RECV_TIME] / iteration / 1e9,
+                  "comp": self._server_metrics[METRIC_COMP_TIME] / iteration / 1e9,
+                  "send": self._server_metrics[METRIC_SEND_TIME] / iteration / 1e9,
+                  "load": self._server_metrics[METRIC_COMP_TIME] / overall}
 
         return output
 
@@ -182,6 +318,9 @@ class VideoProcessor(Processor):
         # Terminate the server process
         self._server.terminate()
 
+        # Release the shared memory ring
+        self._release_shm()
+
 
 class TrackProcessor(Processor):
     """
@@ -193,15 +332,19 @@ class TrackProcessor(Processor):
 
     def __init__(self, port):
         super(Processor).__init__()
+        # Shared metrics array, the server writes its counters into
+        # it and we read them directly without any message traffic
+        self._server_metrics = RawArray('d', METRIC_COUNT)
+
         # Initialize the TrackProcessingServer, don't have any
         # access to server object from client side. Just managing
         # its lifecycle.
-        self._server = TrackProcessingServer(port=port)
+        self._server = TrackProcessingServer(port=port, metrics=self._server_metrics)
         self._server.start()
-        self._server_metrics = {}
 
-        # Initialize the client with a PairClient object
-        self._client = PairClient(address=f"tcp://127.0.0.1:{port}")
+        # Initialize the client with a PairClient object.
+        # The server is a local process so the pair runs over ipc.
+        self._client = PairClient(address=ipc_address(port))
 
         # Keep tracks information
         self.tracks = {}
@@ -219,24 +362,29 @@ class TrackProcessor(Processor):
         Args:
             data: points as numpy array [[x1, y1] [x2, y2]]
         """
-        args = {"reset": self._reset_flag,
-                "metrics": True}
-
-        self._client.send_array(args, np.array(data))
+        args = {"reset": self._reset_flag}
+
+        # The unconditional np.array constructor copied on every
+        # send. Peaks already arrive as an ndarray, only convert
+        # when something else is handed in; the contiguity is
+        # handled inside send_array.
+        if not isinstance(data, np.ndarray):
+            data = np.asarray(data)
+        self._client.send_array(args, data)
 
         # Set _send_flag to True for synchronization
         self._send_flag = True
 
-    @property
-    def recv(self) -> Union[List, None]:
+    def recv(self) -> Union[Dict, None]:
         """
-        Receive tracking information.
+        Receive tracking information. A plain method: the property
+        form made every attribute access run a blocking socket
+        round trip, which is too much magic for an IPC call.
 
         Returns:
             None if _send_flag is not set, otherwise
             Dict:
                 "tracks" : []
-                "metrics" : []
         """
 
         result = self._client.recv_dict()
@@ -252,9 +400,6 @@ class TrackProcessor(Processor):
                     self.tracks[key] = [point]
             output["tracks"] = self.tracks
 
-        # Update server metrics
-        self._server_metrics = result["metrics"]
-
         # Set _send_flag as False
         self._send_flag = False
 
@@ -263,6 +408,16 @@ class TrackProcessor(Processor):
 
         return output
 
+    def drain(self):
+        """
+        Receives a reply and throws it away without merging it into
+        the tracks. Used for a request that was already in flight
+        when a seek reset the tracker: its points belong to the
+        pre-reset track ids and must not leak into the cleared
+        tracks dictionary.
+        """
+        self._client.recv_dict()
+
     def server_metrics(self) -> dict:
         """
         Returns server metrics.
@@ -274,10 +429,15 @@ class TrackProcessor(Processor):
                 ["send"]: Sending time mean
                 ["load"]: Computation Time / Overall Time
         """
-        output = {"recv": self._server_metrics["recv_time"] / self._server_metrics["iteration"],
-                  "comp": self._server_metrics["comp_time"] / self._server_metrics["iteration"],
-                  "send": self._server_metrics["send_time"] / self._server_metrics["iteration"],
-                  "load": self._server_metrics["comp_time"] / self._server_metrics["overall_time"]}
+        # Read the shared metrics array written by the server,
+        # guard against the server not being built yet. Times are
+        # stored in nanoseconds, converted to seconds on read.
+        iteration = self._server_metrics[METRIC_ITERATION] or 1
+        overall = self._server_metrics[METRIC_OVERALL_TIME] or 1
+        output = {"recv": self._server_metrics[METRIC_RECV_TIME] / iteration / 1e9,
+                  "comp": self._server_metrics[METRIC_COMP_TIME] / iteration / 1e9,
+                  "send": self._server_metrics[METRIC_SEND_TIME] / iteration / 1e9,
+                  "load": self._server_metrics[METRIC_COMP_TIME] / overall}
 
         return output
 
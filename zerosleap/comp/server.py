@@ -6,23 +6,34 @@ Provides computation from a separate process or a remote computation resource.
 The files that the computation needed should be accessible from server side.
 """
 
+import os
 import time
+import asyncio
 import logging
 import numpy as np
 import tensorflow as tf
 from abc import abstractmethod
-from multiprocessing import Process
+from multiprocessing import Process, shared_memory
+from multiprocessing.sharedctypes import RawArray
 
 from typing import Optional, Union, Text, Dict
 
-from zerosleap.conn.pair import PairServer
+from zerosleap.conn.pair import AsyncPairServer, ipc_address
 from zerosleap.processing.heatmap import find_heatmap_peaks
 
-from zerosleap.processing.tracking.track import centroid_distance, Detection
+from zerosleap.processing.tracking.track import centroid_distance
 from zerosleap.processing.tracking.tracker import Tracker
 
 logger = logging.getLogger(__name__)
 
+# Offsets of the counters inside the shared metrics array
+METRIC_ITERATION = 0
+METRIC_OVERALL_TIME = 1
+METRIC_RECV_TIME = 2
+METRIC_SEND_TIME = 3
+METRIC_COMP_TIME = 4
+METRIC_COUNT = 5
+
 
 class ProcessingServer(Process):
     """
@@ -38,19 +49,29 @@ class ProcessingServer(Process):
         - Send back computation outputs to the client.
     """
 
-    def __init__(self, port: Optional[Union[Text, int]] = "9999"):
+    def __init__(self,
+                 port: Optional[Union[Text, int]] = "9999",
+                 metrics: Optional[RawArray] = None):
         super(ProcessingServer, self).__init__()
-        self._metrics = {}
+        # Shared metrics array, written by the server process and
+        # read directly by the client side without any message
+        # traffic. Allocated here if the client did not provide one.
+        self._metrics = metrics if metrics is not None else RawArray('d', METRIC_COUNT)
         self._port = port
 
     def build(self):
         """All the initialization process should be inside the build function"""
 
-        # Communication node for receiving and sending data
-        self._server = PairServer(f'tcp://*:{str(self._port)}')
+        # Communication node for receiving and sending data.
+        # The client lives on the same host (spawned with
+        # multiprocessing) so the pair runs over ipc.
+        self._server = AsyncPairServer(ipc_address(self._port))
+
+        # Shared memory blocks attached for in place payloads,
+        # keyed by block name
+        self._shm_attached = {}
 
         # Initialize server metrics.
-        self._metrics = {}
         self.init_metrics()
 
         logger.info(f"Processing server initialized.")
@@ -65,66 +86,143 @@ class ProcessingServer(Process):
 
         logger.info(f"Processing server started to running: {time.time()}")
 
-        while True:
-            # loop time start
-            lts = time.time()
-            self._metrics["iteration"] += 1
-
-            try:
-                ts = time.time()
-                # Receive the data that should be computed.
-                args, data = self._server.recv_array()
-                te = time.time()
-
-                # If receiving time bigger than 1 seconds reset metrics
-                if te-ts > 1:
-                    self.init_metrics()
-
-                self._metrics["recv_time"] += te-ts
-            except Exception:
-                raise ConnectionError(
-                    f"Can not received the data from client node."
-                )
-
-            # If stop request is came break the loop
-            if "stop" in args:
-                break
-
-            ts = time.time()
-            # Make the computation at the server node
-            output = self.process(data, args)
-            te = time.time()
-            self._metrics["comp_time"] += te-ts
-
-            try:
-                ts = time.time()
-                # Send the calculated output.
-                if type(output) == np.ndarray:
-                    pass
-                elif type(output) == dict:
-                    self._server.send_dict(output)
-                else:
-                    raise AssertionError(
-                        f'Not supported output type {type(output)}.'
+        # Serve with an asyncio loop so receiving, computing and
+        # sending can overlap instead of running strictly serial
+        asyncio.run(self._serve())
+
+    async def _serve(self):
+        """
+        Pipelined server loop. Three tasks connected by bounded
+        queues: an inbound task reading requests from the socket,
+        a compute task running process() in a worker thread and an
+        outbound task writing the replies back. This way socket
+        syscalls do not stall the computation and vice versa.
+        """
+        loop = asyncio.get_running_loop()
+
+        # Hoist the shared array and the clock into locals, the
+        # attribute lookups are on the per message hot path.
+        # perf_counter_ns stays in userspace (vDSO) unlike time.time
+        # style wall clock reads and never goes backwards.
+        metrics = self._metrics
+        clock = time.perf_counter_ns
+
+        # Bounded queues keep back-pressure towards the socket
+        requests = asyncio.Queue(maxsize=2)
+        replies = asyncio.Queue(maxsize=2)
+
+        async def inbound():
+            while True:
+                try:
+                    ts = clock()
+                    # Receive the data that should be computed.
+                    args, data = await self._server.recv_array()
+                    te = clock()
+
+                    # If receiving time bigger than 1 seconds reset metrics
+                    if te-ts > 1_000_000_000:
+                        self.init_metrics()
+
+                    metrics[METRIC_RECV_TIME] += te-ts
+                except Exception:
+                    raise ConnectionError(
+                        f"Can not received the data from client node."
                     )
-                te = time.time()
-                self._metrics["send_time"] += te-ts
-            except Exception:
-                raise ConnectionError(
-                    f"Can not send the data."
-                )
 
-            # loop time end
-            lte = time.time()
-            self._metrics["overall_time"] += lte-lts
+                # If stop request is came propagate it and finish
+                if "stop" in args:
+                    await requests.put(None)
+                    break
+
+                # A shared memory descriptor replaces the payload,
+                # map the block and read the frames in place
+                if "shm" in args:
+                    data = self._resolve_shm(args["shm"])
+
+                # The recv start timestamp travels with the request
+                # so the overall time can be closed once the reply
+                # has been sent
+                await requests.put((args, data, ts))
+
+        async def compute():
+            while True:
+                request = await requests.get()
+                if request is None:
+                    await replies.put(None)
+                    break
+
+                metrics[METRIC_ITERATION] += 1
+                args, data, ts_request = request
+
+                ts = clock()
+                # Make the computation in a worker thread, TF and
+                # numpy release the GIL there so the socket tasks
+                # keep flowing in the meantime.
+                output = await loop.run_in_executor(None, self.process, data, args)
+                te = clock()
+                metrics[METRIC_COMP_TIME] += te-ts
+
+                await replies.put((output, ts_request))
+
+        async def outbound():
+            while True:
+                reply = await replies.get()
+                if reply is None:
+                    break
+                output, ts_request = reply
+
+                try:
+                    ts = clock()
+                    # Send the calculated output.
+                    if type(output) == np.ndarray:
+                        pass
+                    elif type(output) == dict:
+                        await self._server.send_dict(output)
+                    else:
+                        raise AssertionError(
+                            f'Not supported output type {type(output)}.'
+                        )
+                    te = clock()
+                    metrics[METRIC_SEND_TIME] += te-ts
+
+                    # Overall time spans the whole pipeline per
+                    # request, from recv start to reply sent, so
+                    # load = comp/overall keeps reporting real
+                    # utilization including the recv wait
+                    metrics[METRIC_OVERALL_TIME] += te-ts_request
+                except Exception:
+                    raise ConnectionError(
+                        f"Can not send the data."
+                    )
+
+        await asyncio.gather(inbound(), compute(), outbound())
+
+    def _resolve_shm(self, desc: Dict) -> np.ndarray:
+        """
+        Resolves a shared memory payload descriptor into an ndarray
+        view. The block attachment is cached by name, steady state
+        requests reuse the mapping.
+
+        Args:
+            desc: Descriptor with block name, shape and dtype
+
+        Returns:
+            ndarray view over the shared memory block
+        """
+        shm = self._shm_attached.get(desc["name"])
+        if shm is None:
+            shm = shared_memory.SharedMemory(name=desc["name"])
+            self._shm_attached[desc["name"]] = shm
+        return np.ndarray(tuple(desc["shape"]), dtype=desc["dtype"], buffer=shm.buf)
 
     def init_metrics(self):
-        """Initialize/Reset server metrics"""
-        self._metrics["iteration"] = 1
-        self._metrics["overall_time"] = 0.000001
-        self._metrics["recv_time"] = 0
-        self._metrics["send_time"] = 0
-        self._metrics["comp_time"] = 0
+        """Initialize/Reset server metrics. Times are kept in nanoseconds."""
+        self._metrics[METRIC_ITERATION] = 1
+        # Small non-zero value to avoid division by zero on read
+        self._metrics[METRIC_OVERALL_TIME] = 1
+        self._metrics[METRIC_RECV_TIME] = 0
+        self._metrics[METRIC_SEND_TIME] = 0
+        self._metrics[METRIC_COMP_TIME] = 0
 
     def close(self):
         """Close the connection."""
@@ -142,34 +240,115 @@ class VideoProcessingServer(ProcessingServer):
         - Sends back the results.
     """
 
-    def __init__(self, _model_path, port="9999"):
-        super(VideoProcessingServer, self).__init__(port)
+    def __init__(self, _model_path, port="9999", metrics=None):
+        super(VideoProcessingServer, self).__init__(port, metrics)
         self._model_path = _model_path
 
     def build(self):
         """All the initialization process should be inside the build function"""
         super().build()
+
+        # Cap the TF thread pools, the defaults spawn one intra-op
+        # thread per core and oversubscribe the machine that the
+        # client (GUI, reader, tracker) also runs on. Must happen
+        # before the model is loaded.
+        tf.config.threading.set_intra_op_parallelism_threads(4)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+
+        # Pin the inference process to the upper half of the cores
+        # so it does not contend with the client processes
+        if hasattr(os, "sched_setaffinity"):
+            cores = os.cpu_count() or 1
+            if cores >= 4:
+                os.sched_setaffinity(0, set(range(cores // 2, cores)))
+
         # Load the model.
         self._model = tf.keras.models.load_model(self._model_path, compile=False)
+
+        # Wrap the model call in a tf.function so the traced graph
+        # is reused across calls. model.predict re-enters the Keras
+        # Python batch slicing and callback machinery on every call.
+        self._infer = tf.function(
+            lambda x: self._model(x, training=False),
+            input_signature=[tf.TensorSpec([None, 512, 512, None], tf.float32)],
+        )
+
+        # Try to run inference through a float16 quantized TFLite
+        # model, which halves the weight memory bandwidth. The
+        # converted model is cached next to the keras file so the
+        # conversion cost is paid once; any failure falls back to
+        # the traced keras path above.
+        self._interpreter = None
+        tflite_path = os.path.splitext(self._model_path)[0] + ".fp16.tflite"
+        try:
+            if not os.path.exists(tflite_path):
+                converter = tf.lite.TFLiteConverter.from_keras_model(self._model)
+                converter.optimizations = [tf.lite.Optimize.DEFAULT]
+                converter.target_spec.supported_types = [tf.float16]
+                with open(tflite_path, "wb") as tflite_file:
+                    tflite_file.write(converter.convert())
+            self._interpreter = tf.lite.Interpreter(model_path=tflite_path)
+            self._interpreter.allocate_tensors()
+        except Exception:
+            logger.warning("TFLite conversion failed, falling back to keras inference.")
+
+        # Reusable buffer for normalized frames, reallocated only
+        # when the incoming chunk shape changes
+        self._X_buf = None
+
         logger.info(f"Video Processing server initialized.")
 
+    def _predict(self, X) -> np.ndarray:
+        """
+        Runs inference with the quantized TFLite interpreter when it
+        is available, otherwise with the traced keras graph.
+
+        Args:
+            X: Preprocessed input batch [n, 512, 512, c]
+
+        Returns:
+            Y: Predicted heatmaps as numpy array
+        """
+        if self._interpreter is None:
+            return self._infer(X).numpy()
+
+        if hasattr(X, "numpy"):
+            X = X.numpy()
+
+        interpreter = self._interpreter
+        input_detail = interpreter.get_input_details()[0]
+        output_detail = interpreter.get_output_details()[0]
+
+        # Resize the input tensor when the batch size changes
+        if tuple(input_detail["shape"]) != X.shape:
+            interpreter.resize_tensor_input(input_detail["index"], X.shape)
+            interpreter.allocate_tensors()
+
+        interpreter.set_tensor(input_detail["index"], X)
+        interpreter.invoke()
+        return interpreter.get_tensor(output_detail["index"])
+
     def process(self, data: np.ndarray, args: Dict = None, peaks=True):
         # Preprocess the image for inference.
-        # Normalize and reshape the image data.
-        X = np.expand_dims(data, axis=0).astype("float32") / 255.
-        X = tf.image.resize(X[0], size=[512, 512])
+        # Normalize the image data with a single fused multiply-cast
+        # into a preallocated buffer. The old cast + divide path
+        # allocated twice and swept the chunk memory twice.
+        if self._X_buf is None or self._X_buf.shape != data.shape:
+            self._X_buf = np.empty(data.shape, dtype=np.float32)
+        np.multiply(data, np.float32(1 / 255.), out=self._X_buf, casting='unsafe')
+        X = tf.image.resize(self._X_buf, size=[512, 512])
 
         # Make the prediction.
-        Y = self._model.predict(X)
+        Y = self._predict(X)
 
         output = {}
 
         # Add heatmaps to the output if requested.
-        # Should be returned as np.ndarray as in receiving image,
-        # converting to list is slower approach.
-        # Not recommended, its just for demonstration.
+        # The heatmaps are kept as np.ndarray, converting million
+        # element arrays to nested lists allocates a Python object
+        # per element and is orders of magnitude slower.
         if args["heatmaps"]:
-            output["heatmaps"] = Y.squeeze().tolist()
+            output["heatmaps"] = Y.squeeze()
 
         # Add peaks to the output if requested.
         if args["peaks"]:
@@ -177,17 +356,15 @@ class VideoProcessingServer(ProcessingServer):
             peaks = find_heatmap_peaks(Y)
 
             # Prepare the peaks for serialization.
-            # No object is accepted only list and dict.
+            # Raw ndarrays are kept in the dictionary, the pickle
+            # based dictionary serialization handles them directly
+            # without converting to lists.
             peak_points, peak_vals, peak_sample_idx  = peaks
-            peaks = {"points": peak_points.numpy().tolist(),
-                     "peak_vals": peak_vals.numpy().tolist(),
-                     "frame_idx": peak_sample_idx.numpy().tolist()}
+            peaks = {"points": peak_points,
+                     "peak_vals": peak_vals,
+                     "frame_idx": peak_sample_idx}
             output["peaks"] = peaks
 
-        # Add server metrics to the output if requested.
-        if args["metrics"]:
-            output["metrics"] = self._metrics
-
         return output
 
 
@@ -203,8 +380,9 @@ class TrackProcessingServer(ProcessingServer):
 
     def __init__(self,
                  port: Optional[Union[Text, int]] = "5555",
-                 input_type: Optional[Union[Dict, np.ndarray]] = np.ndarray):
-        super(TrackProcessingServer, self).__init__(port)
+                 input_type: Optional[Union[Dict, np.ndarray]] = np.ndarray,
+                 metrics=None):
+        super(TrackProcessingServer, self).__init__(port, metrics)
         self.input_type = input_type
 
     def build(self):
@@ -219,13 +397,10 @@ class TrackProcessingServer(ProcessingServer):
         if args["reset"] == True:
             self._tracker = Tracker(distance_function=centroid_distance, distance_threshold=20)
 
-        # Generate Detection objects from input data [x, y]
-        detections = []
-        for point in data:
-            detections.append(Detection(point))
-
-        # Update the tracker with detections and assign each detection to tracked objects
-        tracked_objects = self._tracker.update(detections)
+        # Update the tracker with the raw detection points [x, y] and
+        # assign each detection to tracked objects. No per detection
+        # wrapper objects are allocated.
+        tracked_objects = self._tracker.update(data)
 
         # Prepare the tracked objects for serialization
         points = {}
@@ -234,10 +409,4 @@ class TrackProcessingServer(ProcessingServer):
 
         output = {"tracks": points}
 
-        # Add tracks to the output.
-
-        # Add metrics to the output if requested.
-        if args["metrics"]:
-            output["metrics"] = self._metrics
-
         return output
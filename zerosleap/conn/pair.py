@@ -15,10 +15,48 @@ This can be replaced with SUB/PUB socket using two separate connection
 in a node for using sending and receiving.
 """
 
+import pickle
+import logging
+
 import zmq
 import numpy as np
 
-from zerosleap.conn.serialize import SerializingContext
+from zerosleap.conn.serialize import SerializingContext, AsyncSerializingContext
+
+logger = logging.getLogger(__name__)
+
+
+def ipc_address(port) -> str:
+    """
+    Builds an ipc:// (unix domain socket) address for the given
+    port number. Both ends of a same-host pair should prefer this
+    over tcp://127.0.0.1, it bypasses the TCP loopback stack and
+    is noticeably faster for large frame payloads. Only available
+    on POSIX platforms, use tcp addresses for remote servers.
+
+    Args:
+        port: Port like identifier, used to name the socket file
+
+    Returns:
+        address: ipc address usable for bind and connect
+    """
+    return f"ipc:///tmp/zerosleap-{port}.sock"
+
+
+def _tune_socket(socket):
+    """
+    Tunes socket options for the large frame payloads this pair
+    carries. The zmq defaults (HWM 1000, small kernel buffers) are
+    sized for tiny messages; a few multi megabyte frames queued up
+    only add latency, and bursts benefit from larger kernel
+    buffers. The linger keeps the stop request from being dropped
+    on close while still bounding shutdown time.
+    """
+    socket.setsockopt(zmq.SNDHWM, 4)
+    socket.setsockopt(zmq.RCVHWM, 4)
+    socket.setsockopt(zmq.SNDBUF, 8 << 20)
+    socket.setsockopt(zmq.RCVBUF, 8 << 20)
+    socket.setsockopt(zmq.LINGER, 1000)
 
 
 class PairNode:
@@ -38,10 +76,20 @@ class PairNode:
         socket_type = zmq.PAIR
         self._zmq_context = SerializingContext()
         self._zmq_socket = self._zmq_context.socket(socket_type)
+        _tune_socket(self._zmq_socket)
+
+        # Reusable scratch buffer for sending non-contiguous arrays,
+        # prevents allocating a full copy on every send
+        self._scratch = None
+        self._warned_non_contiguous = False
 
     def send_array(self, args: dict, data: np.ndarray):
         """
-        Serialize and sends ndarray (numpy array) data
+        Serialize and sends ndarray (numpy array) data.
+
+        C contiguous (row-major) arrays are the contract on this
+        boundary, every downstream consumer relies on sequential
+        strides. Anything else is converted here, once.
 
         Args:
             args: The parameters we need to send additional to data
@@ -51,13 +99,26 @@ class PairNode:
             None
         """
 
-        if data.flags['C_CONTIGUOUS']:
-            # if data is already contiguous in memory just send it
-            self._zmq_socket.send_array(data, args)
-        else:
-            # else make it contiguous before sending
-            image = np.ascontiguousarray(data)
-            self._zmq_socket.send_array(image, args)
+        if not data.flags['C_CONTIGUOUS']:
+            # Warn once so the producer can be fixed upstream, the
+            # copy below hides the cost otherwise
+            if not self._warned_non_contiguous:
+                logger.warning("send_array received a non-contiguous array, "
+                               "prefer C order on this boundary.")
+                self._warned_non_contiguous = True
+            # Make the data contiguous by copying into a reusable
+            # scratch buffer. The PAIR protocol is strictly
+            # request/reply so the buffer is flushed before the
+            # next send can overwrite it.
+            if self._scratch is None or \
+                    self._scratch.shape != data.shape or \
+                    self._scratch.dtype != data.dtype:
+                self._scratch = np.empty_like(data, order='C')
+            np.copyto(self._scratch, data)
+            data = self._scratch
+
+        # Contiguous data is handed to zmq without any copy
+        self._zmq_socket.send_array(data, args)
 
     def recv_array(self) -> [dict, np.ndarray]:
         """
@@ -73,8 +134,10 @@ class PairNode:
 
     def send_dict(self, data: dict):
         """
-        Sends already serialized dictionary data. Dictionary
-        values also should be serialized.
+        Serialize and sends dictionary data. Pickle is used
+        instead of json, its binary framing handles numpy
+        arrays as values directly and avoids text encoding
+        of large float/int collections.
 
         Args:
             data: Dictionary data
@@ -82,7 +145,8 @@ class PairNode:
         Returns:
             None
         """
-        self._zmq_socket.send_json(data)
+        buffer = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        self._zmq_socket.send(buffer, copy=False)
 
     def recv_dict(self) -> dict:
         """
@@ -91,7 +155,7 @@ class PairNode:
         Returns:
             data: Dictionary data
         """
-        data = self._zmq_socket.recv_json(flags=0)
+        data = pickle.loads(self._zmq_socket.recv(flags=0, copy=False).buffer)
         return data
 
     def close(self):
@@ -140,3 +204,72 @@ class PairServer(PairNode):
         super(PairServer, self).__init__()
         # Binds the client
         self._zmq_socket.bind(address)
+
+
+class AsyncPairServer:
+    """
+    Asyncio variant of PairServer. Used by the processing servers
+    to overlap receiving, computation and sending inside one
+    process. The client side stays synchronous.
+    """
+
+    def __init__(self, address='tcp://*:5555'):
+        """
+        Initialize the AsyncPairServer
+
+        Args:
+            address: Client address to be bind
+        """
+        self._zmq_context = AsyncSerializingContext()
+        self._zmq_socket = self._zmq_context.socket(zmq.PAIR)
+        _tune_socket(self._zmq_socket)
+        self._zmq_socket.bind(address)
+
+    async def send_array(self, args: dict, data: np.ndarray):
+        """
+        Serialize and sends ndarray (numpy array) data
+
+        Args:
+            args: The parameters we need to send additional to data
+            data: Serialized ndarray (numpy array) data
+        """
+        if not data.flags['C_CONTIGUOUS']:
+            data = np.ascontiguousarray(data)
+        await self._zmq_socket.send_array(data, args)
+
+    async def recv_array(self) -> [dict, np.ndarray]:
+        """
+        Receive serialized ndarray (numpy array) data with
+        non-copy manner.
+
+        Returns:
+            args: The parameters we need to send additional to data
+            data: Serialized ndarray (numpy array) data
+        """
+        args, data = await self._zmq_socket.recv_array()
+        return args, data
+
+    async def send_dict(self, data: dict):
+        """
+        Serialize and sends dictionary data with pickle.
+
+        Args:
+            data: Dictionary data
+        """
+        buffer = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        await self._zmq_socket.send(buffer, copy=False)
+
+    async def recv_dict(self) -> dict:
+        """
+        Receives serialized dictionary data
+
+        Returns:
+            data: Dictionary data
+        """
+        msg = await self._zmq_socket.recv(flags=0, copy=False)
+        return pickle.loads(msg.buffer)
+
+    def close(self):
+        """Closes ZMQ Socket and Context"""
+        self._zmq_socket.close()
+        self._zmq_context.term()
@@ -1,13 +1,76 @@
+import pickle
+import struct
+
 import zmq
+import zmq.asyncio
 import numpy as np
 
 
+# Mapping between numpy dtypes and single byte codes used in the
+# binary array header. Covers the dtypes that cross the wire.
+_DTYPE_CODES = {
+    'uint8': 0,
+    'int32': 1,
+    'int64': 2,
+    'float16': 3,
+    'float32': 4,
+    'float64': 5,
+    'bool': 6,
+}
+_CODE_DTYPES = {code: dtype for dtype, code in _DTYPE_CODES.items()}
+
+# Fixed binary header: dtype code, number of dims and up to
+# six dimension sizes. The pickled args blob follows the header
+# in the same frame.
+_META_HEADER = struct.Struct('<BBxx6I')
+
+
+def pack_meta(data: np.ndarray, args) -> bytes:
+    """
+    Packs array metadata (dtype, shape) into a fixed binary header
+    followed by the pickled args. A struct packed header replaces
+    the json envelope, no text encoding or parsing per message.
+
+    Args:
+        data: Numpy array the header describes.
+        args: The parameters we need to send additional to data
+
+    Returns:
+        Header bytes followed by the pickled args blob
+    """
+    shape = data.shape + (0,) * (6 - data.ndim)
+    header = _META_HEADER.pack(_DTYPE_CODES[str(data.dtype)], data.ndim, *shape)
+    return header + pickle.dumps(args, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def unpack_meta(buffer) -> tuple:
+    """
+    Unpacks array metadata packed with pack_meta.
+
+    Args:
+        buffer: Received meta frame buffer
+
+    Returns:
+        args: The parameters sent additional to data
+        dtype: Data type of the array as string
+        shape: Shape of the array as tuple
+    """
+    dtype_code, ndim, *dims = _META_HEADER.unpack_from(buffer)
+    args = pickle.loads(bytes(buffer[_META_HEADER.size:]))
+    return args, _CODE_DTYPES[dtype_code], tuple(dims[:ndim])
+
+
 class SerializingSocket(zmq.Socket):
     """
     Defines a serializing socket for sending and receiving
     ndarray (numpy array) and OpenCV Images
     """
 
+    # Cached (key, packed meta) of the last send_array. Must be a
+    # class attribute: zmq.Socket treats setattr on names not
+    # defined on the class as socket option writes and raises
+    _meta_cache = None
+
     def send_array(self, data, args=None, flags=0):
         """
         Sends numpy array with metadata necessary for reconstructing
@@ -19,16 +82,20 @@ class SerializingSocket(zmq.Socket):
             flags:
         """
 
-        # Serialize the data
-        meta_data = {'args': args,
-                     'dtype': str(data.dtype),
-                     'shape': data.shape}
-
-        # Send the meta data
-        self.send_json(meta_data, flags | zmq.SNDMORE)
-
-        # Send the numpy array
-        self.send(data, flags, copy=False, track=False)
+        # Reuse the packed meta bytes while dtype, shape and args
+        # stay the same; the steady-state video stream re-sends an
+        # identical header with every message.
+        key = (data.dtype, data.shape, args)
+        cache = self._meta_cache
+        if cache is None or cache[0] != key:
+            cache = (key, pack_meta(data, args))
+            self._meta_cache = cache
+
+        # Send meta data and payload with one multipart call, a
+        # single pass through the zmq lock instead of two. The
+        # frame wrapping hands the memory to zmq without any copy.
+        frame = zmq.Frame(memoryview(data), track=False)
+        self.send_multipart([cache[1], frame], flags, copy=False, track=False)
 
     def recv_array(self, flags=0):
         """
@@ -43,18 +110,84 @@ class SerializingSocket(zmq.Socket):
             data: Numpy array or OpenCV image reconstructed with dtype and shape.
         """
 
-        # Receives meta data for reconstruction
-        meta_data = self.recv_json(flags=flags)
-
-        # Receives the serialized data
-        serialized_data = self.recv(flags=flags, copy=False, track=False)
+        # Receive meta data and payload with one multipart call
+        meta, msg = self.recv_multipart(flags=flags, copy=False, track=False)
+        args, dtype, shape = unpack_meta(meta.buffer)
 
-        # Reconstruct the data
-        data = np.frombuffer(serialized_data, dtype=meta_data['dtype'])
+        # Reconstruct the data on top of the received buffer.
+        # frombuffer marks the array read-only by default which
+        # forces downstream consumers (preprocessing, resize) to
+        # copy; the frame buffer is owned by us and kept alive as
+        # the array base, so it is safe to flip it writable.
+        data = np.frombuffer(msg.buffer, dtype=dtype)
+        data.setflags(write=True)
 
         # Returns reconstructed numpy array
-        return meta_data['args'], data.reshape(meta_data['shape'])
+        return args, data.reshape(shape)
 
 
 class SerializingContext(zmq.Context):
     _socket_class = SerializingSocket
+
+
+class AsyncSerializingSocket(zmq.asyncio.Socket):
+    """
+    Asyncio variant of SerializingSocket. Used by the processing
+    servers so socket I/O can be overlapped with computation.
+    """
+
+    # Class attribute for the same reason as SerializingSocket:
+    # setattr of undeclared names is a socket option write
+    _meta_cache = None
+
+    async def send_array(self, data, args=None, flags=0):
+        """
+        Sends numpy array with metadata necessary for reconstructing
+        the array (dtype, shape) and additional arguments.
+
+        Args:
+            data: Numpy array or OpenCV image.
+            args: The parameters we need to send additional to data
+            flags:
+        """
+
+        # Reuse the packed meta bytes while dtype, shape and args
+        # stay the same, see SerializingSocket.send_array
+        key = (data.dtype, data.shape, args)
+        cache = self._meta_cache
+        if cache is None or cache[0] != key:
+            cache = (key, pack_meta(data, args))
+            self._meta_cache = cache
+
+        # Send meta data and payload with one multipart call,
+        # the frame wrapping avoids copying the payload
+        frame = zmq.Frame(memoryview(data), track=False)
+        await self.send_multipart([cache[1], frame], flags, copy=False, track=False)
+
+    async def recv_array(self, flags=0):
+        """
+        Receives numpy array with metadata necessary for reconstructing
+        the array (dtype, shape) and additional arguments.
+
+        Args:
+            flags: Connection flag
+
+        Returns:
+            args: The parameters we need to send additional to data
+            data: Numpy array or OpenCV image reconstructed with dtype and shape.
+        """
+
+        # Receive meta data and payload with one multipart call
+        meta, msg = await self.recv_multipart(flags=flags, copy=False, track=False)
+        args, dtype, shape = unpack_meta(meta.buffer)
+
+        # Reconstruct the data on top of the received buffer
+        data = np.frombuffer(msg.buffer, dtype=dtype)
+        data.setflags(write=True)
+
+        # Returns reconstructed numpy array
+        return args, data.reshape(shape)
+
+
+class AsyncSerializingContext(zmq.asyncio.Context):
+    _socket_class = AsyncSerializingSocket
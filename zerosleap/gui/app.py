@@ -13,13 +13,159 @@ bar for displaying comparing Video Processing Server and Track \
 Processing Server statistics.
 """
 
+import bisect
+
 from PySide2.QtWidgets import QWidget, QLabel, QStyle, QStatusBar, \
     QHBoxLayout, QMainWindow, QTableView, QToolBar, QAction, QCheckBox, QMessageBox
-from PySide2.QtGui import QStandardItemModel, Qt, QStandardItem, QBrush, QColor
+from PySide2.QtGui import Qt, QBrush, QColor
+from PySide2.QtCore import QAbstractTableModel, QModelIndex, QTimer
 
 from zerosleap.gui.utils import get_random_color
 from zerosleap.gui.player import VideoPlayer
 
+# Shared state strings, every row references the same two objects
+# instead of materializing a new str per update
+STATE_ACTIVE = "Active"
+STATE_PASSIVE = "Passive"
+
+# Brush per track id, shared by every row repaint. QBrush is
+# implicitly shared so reusing one instance is safe and skips the
+# color generation and two Qt allocations per data() call.
+_brush_cache = {}
+
+
+def _track_brush(track_id: int) -> QBrush:
+    """Returns the cached background brush of a track id."""
+    brush = _brush_cache.get(track_id)
+    if brush is None:
+        brush = QBrush(QColor(get_random_color(track_id)))
+        _brush_cache[track_id] = brush
+    return brush
+
+
+class TracksModel(QAbstractTableModel):
+    """
+    Lazy table model for the tracks table. Rows are kept in a plain
+    list of [id, state, age] entries sorted by numeric track id and
+    values are served on demand through data(), so Qt only queries
+    the visible rows during paint. Appending a track inserts one
+    list entry instead of allocating an item per cell.
+    """
+
+    HEADERS = ("Id", "State", "Age")
+
+    # Column indexes of the row layout
+    COL_ID = 0
+    COL_STATE = 1
+    COL_AGE = 2
+
+    def __init__(self, parent=None):
+        super(TracksModel, self).__init__(parent)
+        # Rows as [track_id, state, age] lists, sorted by numeric id
+        self._rows = []
+        # Sorted numeric track ids for bisect based insertion
+        self._ids = []
+        # Maps track id to its row index
+        self._id_to_row = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole:
+            return self._rows[index.row()][index.column()]
+
+        if role == Qt.BackgroundRole and index.column() == self.COL_ID:
+            track_id = self._rows[index.row()][self.COL_ID]
+            return _track_brush(int(track_id))
+
+        if role == Qt.TextAlignmentRole:
+            if index.column() == self.COL_STATE:
+                return int(Qt.AlignCenter | Qt.AlignVCenter)
+            if index.column() == self.COL_AGE:
+                return int(Qt.AlignLeft | Qt.AlignVCenter)
+
+        return None
+
+    def update_track(self, track_id, state, age):
+        """
+        Updates the row of track_id in place. A new track inserts
+        one row at its sorted position, no model wide sort runs.
+
+        Args:
+            track_id: Track label
+            state: State text to show ("Active"/"Passive")
+            age: Age text to show
+        """
+        self.update_tracks([(track_id, state, age)])
+
+    def update_tracks(self, updates):
+        """
+        Applies a batch of row updates with a single dataChanged
+        emit spanning the changed row range, instead of one signal
+        per touched cell. New tracks are inserted first so the
+        row range is stable while the updates are applied.
+
+        Args:
+            updates: Iterable of (track_id, state, age) tuples
+        """
+        pending = []
+        for track_id, state, age in updates:
+            if track_id not in self._id_to_row:
+                self._insert_row(track_id, state, age)
+            else:
+                pending.append((track_id, state, age))
+
+        first = last = None
+        for track_id, state, age in pending:
+            row = self._id_to_row[track_id]
+            row_data = self._rows[row]
+            # Skip unchanged rows (and the repaint they would
+            # cause), the common case for settled tracks
+            if row_data[self.COL_STATE] == state and \
+                    row_data[self.COL_AGE] == age:
+                continue
+            row_data[self.COL_STATE] = state
+            row_data[self.COL_AGE] = age
+            if first is None or row < first:
+                first = row
+            if last is None or row > last:
+                last = row
+
+        if first is not None:
+            self.dataChanged.emit(self.index(first, self.COL_STATE),
+                                  self.index(last, self.COL_AGE),
+                                  [Qt.DisplayRole])
+
+    def _insert_row(self, track_id, state, age):
+        """Inserts a new track row at its sorted position."""
+        row = bisect.bisect_left(self._ids, int(track_id))
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._ids.insert(row, int(track_id))
+        self._rows.insert(row, [track_id, state, age])
+        # Reindex the rows shifted by the insertion
+        self._id_to_row = {r[self.COL_ID]: i for i, r in enumerate(self._rows)}
+        self.endInsertRows()
+
+    def reset(self):
+        """Clears all rows with a single model reset."""
+        if self._rows:
+            # One reset signal instead of row removal bookkeeping,
+            # attached views rebuild from scratch in O(1) signal work
+            self.beginResetModel()
+            self._rows.clear()
+            self._ids.clear()
+            self._id_to_row.clear()
+            self.endResetModel()
+
 
 class MainWindow(QMainWindow):
     def __init__(self, *args, **kwargs):
@@ -38,14 +184,44 @@ class MainWindow(QMainWindow):
                                 "show_traces": True,
                                 "show_labels": True}
 
+        # Bumped on every option toggle so the player can tell a
+        # cached scene rendering is stale
+        self.display_options_version = 0
+
         layout.addWidget(self.video_player)
         layout.addWidget(self.tracks_table)
 
-        # Create tracks model and items to show in tracks table.
-        self.tracks_model = QStandardItemModel()
-        self.tracks_model.setHorizontalHeaderLabels(["Id", "State", "Age"])
+        # Create tracks model to show in tracks table.
+        self.tracks_model = TracksModel(self)
         self.tracks_table.setModel(self.tracks_model)
-        self.track_items = {}
+
+        # Last seen trace length per track id, used to detect
+        # passive tracks when flushing updates
+        self._last_trace_len = {}
+
+        # Ids already shown as passive; settled tracks are skipped
+        # before an update tuple is even built for them
+        self._passive_ids = set()
+
+        # Tracks updates are coalesced: update_track_viewer only
+        # stores the latest tracks dict and this timer flushes it
+        # into the model at most once per 100 ms. Rapid emissions
+        # between two flushes overwrite each other instead of each
+        # walking the whole table through the Qt event loop.
+        self._pending_tracks = None
+        self._tracks_timer = QTimer(self)
+        self._tracks_timer.setInterval(100)
+        self._tracks_timer.timeout.connect(self._flush_tracks)
+        self._tracks_timer.start()
+
+        # Server statistics are polled at 1 Hz from the GUI thread
+        # instead of being formatted and emitted from the frame
+        # loop. The controller is attached by set_stats_source.
+        self._stats_source = None
+        self._stats_timer = QTimer(self)
+        self._stats_timer.setInterval(1000)
+        self._stats_timer.timeout.connect(self._poll_server_stats)
+        self._stats_timer.start()
 
         widget = QWidget()
         widget.setLayout(layout)
@@ -91,72 +267,28 @@ class MainWindow(QMainWindow):
 
         self.setStatusBar(self.status_bar)
 
-    def get_or_create_track_row(self, track: dict) -> ():
-        """
-        Get or create a track row in tracks table
-
-        Args:
-            track: Track label and trace
-        """
-
-        track_id = track[0]
-        if track_id not in self.track_items:
-            self.track_items[track_id] = self.add_track_row(track)
-        return self.track_items[track_id]
-
-    def add_track_row(self, track):
-        """
-        Adds a track row to the tracks table model.
-
-        Args:
-            track: Track label and trace
+    def reset_tracks_table(self):
+        """Reset tracks model and trace length cache"""
+        self.tracks_model.reset()
+        self._last_trace_len = {}
+        self._passive_ids = set()
 
-        Returns:
-            id_item
-            status_item
-            age_item
+    def set_stats_source(self, controller):
         """
-        id_item = QStandardItem()
-        id_item.setText(track[0])
-        id_item.setBackground(QBrush(QColor(
-            get_random_color(int(track[0]))
-        )))
-        id_item.setEditable(False)
-
-        status_item = QStandardItem()
-        status_item.setTextAlignment(Qt.AlignCenter | Qt.AlignVCenter)
-        status_item.setEditable(False)
-
-        age_item = QStandardItem()
-        age_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        age_item.setEditable(False)
-
-        self.tracks_model.appendRow([id_item, status_item, age_item])
-        self.tracks_model.sort(0)
-        return id_item, status_item, age_item
-
-    def update_track_row(self, track_id, trace):
-        """
-        Updates track list and model
+        Attaches the video controller whose server summaries the
+        status bar shows.
 
         Args:
-            track_id
-            trace
+            controller: VideoController providing server_summaries
         """
-        status = "Active"
-        if track_id in self.track_items:
-            # If length of the track trace is not changed
-            # Track is passive
-            if len(self.track_items[track_id]) == len(trace):
-                status = "Passive"
-        track_id, track_status, track_age = self.get_or_create_track_row(track_id)
-        track_status.setText(status)
-        track_age.setText(f"{len(trace)//24}")
+        self._stats_source = controller
 
-    def reset_tracks_table(self):
-        """Reset tracks_model and track_items"""
-        self.tracks_model.removeRows(0, len(self.track_items))
-        self.track_items = {}
+    def _poll_server_stats(self):
+        """Polls the server summaries into the status bar."""
+        if self._stats_source is None:
+            return
+        vps_summary, tps_summary = self._stats_source.server_summaries()
+        self.update_server_stats(vps_summary, tps_summary)
 
     def update_server_stats(self, vps_stats_summary, tps_stats_summary):
         """
@@ -171,7 +303,7 @@ class MainWindow(QMainWindow):
 
     def update_track_viewer(self, tracks):
         """
-        Update tracks table
+        Buffer the latest tracks for the next timer flush
 
         Args:
             tracks
@@ -179,20 +311,48 @@ class MainWindow(QMainWindow):
         if not tracks:  # Skip update if we have no data.
             return
 
+        self._pending_tracks = tracks
+
+    def _flush_tracks(self):
+        """Flush the buffered tracks into the tracks model."""
+        tracks = self._pending_tracks
+        if tracks is None:
+            return
+        self._pending_tracks = None
+
+        # One batch into the model, one dataChanged for the lot
+        updates = []
         for track_id, trace in tracks.items():
-            self.update_track_row(track_id, trace)
+            # If length of the track trace is not changed
+            # Track is passive
+            if self._last_trace_len.get(track_id) == len(trace):
+                # A track already shown as passive cannot have
+                # changed its row either, skip it outright
+                if track_id in self._passive_ids:
+                    continue
+                self._passive_ids.add(track_id)
+                status = STATE_PASSIVE
+            else:
+                self._passive_ids.discard(track_id)
+                status = STATE_ACTIVE
+            self._last_trace_len[track_id] = len(trace)
+            updates.append((track_id, status, f"{len(trace)//24}"))
+        self.tracks_model.update_tracks(updates)
 
     def traces(self):
         """Changes trace display options."""
         self.display_options["show_traces"] = not self.display_options["show_traces"]
+        self.display_options_version += 1
 
     def labels(self):
         """Changes labels display options."""
         self.display_options["show_labels"] = not self.display_options["show_labels"]
+        self.display_options_version += 1
 
     def tracks(self):
         """Changes tracks display options."""
         self.display_options["show_tracks"] = not self.display_options["show_tracks"]
+        self.display_options_version += 1
 
     def closeEvent(self, event):
         """Exit application."""
@@ -5,11 +5,21 @@ data. Acts as a provider for video player.
 
 This class is a content producer for video player.
 And generates frames with raw and processed data.
+
+The work is split over a three stage pipeline of daemon
+threads connected by bounded queues:
+
+    reader -> raw frames -> processor -> results -> muxer
+
+so file decoding, inference round trips and MetaFrame
+assembly overlap instead of running strictly serial in
+one loop.
 """
 
-from threading import Thread
-import time
-from queue import Queue
+from threading import Thread, Event, Condition
+from collections import deque
+from queue import Empty
+from time import perf_counter
 import numpy as np
 
 from zerosleap.comp.processor import VideoProcessor
@@ -17,16 +27,65 @@ from zerosleap.gui.metaframe import MetaFrame
 from zerosleap.video.raeder import VideoReader
 
 
+class FrameQueue:
+    """
+    Bounded queue built on a deque and one condition variable.
+    Covers the subset of queue.Queue the pipeline needs and adds a
+    proper clear(): the deque empties in C under the lock and any
+    producer blocked on a full queue is released, instead of the
+    old reach into Queue.mutex/Queue.queue internals.
+    """
+
+    def __init__(self, maxsize):
+        self._items = deque()
+        self._maxsize = maxsize
+        self._cond = Condition()
+
+    def put(self, item):
+        """Appends item, blocks while the queue is full."""
+        with self._cond:
+            while len(self._items) >= self._maxsize:
+                self._cond.wait()
+            self._items.append(item)
+            self._cond.notify_all()
+
+    def get(self, timeout=None):
+        """
+        Pops the oldest item, blocks while the queue is empty.
+        Raises queue.Empty when the timeout passes without an item.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: len(self._items) > 0, timeout):
+                raise Empty
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def clear(self):
+        """Drops all queued items and releases blocked producers."""
+        with self._cond:
+            self._items.clear()
+            self._cond.notify_all()
+
+
 class VideoComposer:
 
-    def __init__(self, path, buffer_size=256, chunk_size=32):
+    # Chunk size bounds and the target round trip per request used
+    # by the adaptive chunk sizing, 40 ms is one display frame at
+    # 24 fps with headroom
+    MIN_CHUNK = 1
+    MAX_CHUNK = 64
+    TARGET_LATENCY = 0.040
+
+    def __init__(self, path, buffer_size=256, chunk_size=None):
         """"
         Initialize video composer.
 
         Args:
             path: Video filename path.
             buffer_size:
-            chunk_size:
+            chunk_size: Frames per processing request. None picks
+                the size adaptively from the measured round trip.
         """
         self.video_reader = VideoReader(path)
 
@@ -37,131 +96,254 @@ class VideoComposer:
         # especially at GPU.
         self.video_processor = VideoProcessor(9999)
 
-        # Buffer for raw video frames
-        self._buffer = []
+        # Stage queues of the pipeline. Bounded so each stage
+        # back-pressures the one before it. The raw queue is sized
+        # for the largest chunk the adaptive sizing can pick.
+        self._raw_frames = FrameQueue(maxsize=self.MAX_CHUNK * 2)
+        self._processed = FrameQueue(maxsize=4)
 
         # Buffer for the processed frames
         # Keeps also peaks, tracks and heatmaps (optional)
-        self._meta_frames = Queue(maxsize=buffer_size)
-
-        self._run_flag = True
-        self._reset_buffer_flag = False
-        self._frame_index_changed =False
+        self._meta_frames = FrameQueue(maxsize=buffer_size)
+
+        # Lifecycle and seek signalling. Events instead of polled
+        # bools: the OS wakes the waiting stage immediately when
+        # one is set, there is no sleep granularity in the seek or
+        # stop latency.
+        self._stop_ev = Event()
+        self._seek_ev = Event()
+
+        # Seek generation counter. Every item travelling through
+        # the pipeline carries the epoch it was read in; a seek
+        # bumps the counter so stale frames, chunks and replies
+        # from before the seek are dropped at whatever stage they
+        # are in instead of being processed and painted.
+        self._epoch = 0
 
         # Request for heatmap
         self._heatmaps_flag = False
 
-        self._chunk_size = chunk_size
+        # Fixed chunk size when given, otherwise start small and
+        # let the measured request latency steer the size
+        self._auto_chunk = chunk_size is None
+        self._chunk_size = chunk_size if chunk_size is not None else 8
         self._frame_index = 0
 
-        # intialize the thread with the update function
-        # Update function is a non blocking control loop
-        # Except file reading
-        self.thread = Thread(target=self.update, args=())
-        self.thread.daemon = True
+        # Size of the reader's frame ring. Covers every frame the
+        # pipeline can hold at once (meta frame queue, both chunk
+        # buffers in flight) plus slack, so a slot is never reused
+        # while something downstream still references it.
+        self._ring_size = buffer_size + 2 * self.MAX_CHUNK + 8
+
+        # Pipeline stage threads, see the loop docstrings
+        self._threads = [Thread(target=self._read_loop, daemon=True),
+                         Thread(target=self._process_loop, daemon=True),
+                         Thread(target=self._mux_loop, daemon=True)]
 
     def start(self):
-        # start a thread to read frames from the file video stream
-        self.thread.start()
+        # start the pipeline stage threads
+        for thread in self._threads:
+            thread.start()
         return self
 
-    def update(self):
-        """Generate extended frames with raw and processed data."""
-        # Controller loop
-        while self._run_flag:
-
-            # If frame index changed manually and _reset_buffer_flag is set
-            # empty the _frames queue and _buffer
-            if self._reset_buffer_flag:
-                with self._meta_frames.mutex: self._meta_frames.queue.clear()
-                self._buffer = []
-                self._reset_buffer_flag = False
-
-            # Continue to grab images until the _frames queue is full
-            if not self._meta_frames.full():
-
-                # Prevent unnecessary index changing
-                frame_index = None
-                if self._frame_index_changed:
-                    frame_index = self._frame_index
-                    self._frame_index_changed = False
-
-                # read the next frame from the file
-                (grabbed, frame) = self.video_reader.read(frame_index)
-
-                # If the reader reaches end of the file and
-                # the _frames queue is empty wait for another action
-                if not grabbed and self._buffer == []:
-                    time.sleep(0.1)
-                    continue
+    def _read_loop(self):
+        """
+        Reader stage. Decodes frames from the video file into the
+        raw frame queue, blocking on the bounded queue when the
+        downstream stages fall behind. At end of file a single None
+        sentinel asks the processor stage to flush the partial
+        chunk, then the loop idles until a seek wakes it.
+
+        Frames are decoded into a preallocated ring of buffers
+        instead of a fresh array per frame; at video frame rates
+        that is megabytes per second of allocator churn avoided.
+        The ring outsizes everything the pipeline can hold, so a
+        slot is never overwritten while still referenced.
+        """
+        eof_signalled = False
+        ring = None
+        ring_idx = 0
+        while not self._stop_ev.is_set():
+
+            # A seek empties all stage queues and repositions the
+            # reader at the requested index
+            frame_index = None
+            if self._seek_ev.is_set():
+                self._seek_ev.clear()
+                self._drain_queues()
+                frame_index = self._frame_index
+                eof_signalled = False
+
+            # read the next frame from the file as a contiguous
+            # single channel array, downstream copies it into the
+            # chunk buffer with one sequential pass. The first read
+            # establishes the frame geometry and the ring.
+            if ring is None:
+                (grabbed, frame) = self.video_reader.read(frame_index, grayscale=True)
+                if grabbed:
+                    ring = [np.empty_like(frame) for _ in range(self._ring_size)]
+            else:
+                frame = ring[ring_idx]
+                grabbed = self.video_reader.read_into(frame, frame_index)
+                if grabbed:
+                    ring_idx = (ring_idx + 1) % len(ring)
+
+            # If the reader reaches end of the file ask for a tail
+            # flush once and wait until a seek wakes us. The event
+            # is consumed at the top of the loop.
+            if not grabbed:
+                if not eof_signalled:
+                    self._raw_frames.put((self._epoch, None))
+                    eof_signalled = True
+                self._seek_ev.wait(0.1)
+                continue
+
+            self._frame_index += 1
+
+            self._raw_frames.put((self._epoch, frame))
+
+    def _process_loop(self):
+        """
+        Processor stage. Gathers raw frames into chunks, feeds them
+        to the video processing server and pairs the replies with
+        their raw frames for the muxer stage.
+
+        The zmq pair socket is confined to this thread. One request
+        is kept in flight so the server computes a chunk while the
+        next one is still being gathered from the reader.
+
+        Chunks are built in two preallocated buffers used in
+        rotation: while one is in flight to the server the reader
+        output is written into the other, so no chunk sized
+        allocation or stack copy happens per request and the in
+        flight memory is never overwritten. The buffers are backed
+        by shared memory, a request sends only the buffer
+        descriptor and the server reads the frames in place.
+        """
+        chunks = None        # double buffered chunk arrays
+        chunk_idx = 0        # which chunk buffer is being filled
+        fill = 0             # fill position inside the active buffer
+        frames = []          # raw frame refs gathered for the next request
+        pending = None       # frames of the request in flight
+        pending_epoch = 0    # epoch the in flight request was read in
+        sent_at = 0.0        # send time of the request in flight
+
+        def collect():
+            """Collects the in flight reply, drops it when stale."""
+            nonlocal pending
+            result = self.video_processor.recv()
+            self._adapt_chunk_size(len(pending), perf_counter() - sent_at)
+            if pending_epoch == self._epoch:
+                self._processed.put((pending_epoch, pending, result))
+            pending = None
+
+        while not self._stop_ev.is_set():
+            try:
+                epoch, frame = self._raw_frames.get(timeout=0.05)
+            except Empty:
+                # Reader is dry, collect the outstanding reply so
+                # the tail of the stream is not stuck in flight
+                if pending is not None:
+                    collect()
+                continue
+
+            # A partial chunk gathered before a seek is stale,
+            # throw it away before the new epoch fills in
+            if fill and frames and epoch != self._epoch:
+                frames = []
+                fill = 0
+
+            if epoch != self._epoch:
+                continue
+
+            flush = frame is None
+            if not flush:
+                # Map both chunk buffers once the frame geometry is
+                # known, sized for the largest chunk so the shared
+                # memory never needs reallocating when the adaptive
+                # sizing grows the chunk
+                if chunks is None:
+                    max_chunk = self.MAX_CHUNK if self._auto_chunk else self._chunk_size
+                    shape = (max_chunk,) + frame.shape
+                    chunks = self.video_processor.chunk_buffers(shape, frame.dtype)
+                chunks[chunk_idx][fill] = frame
+                frames.append(frame)
+                fill += 1
+
+            if fill >= self._chunk_size or (flush and fill):
+                # Collect the reply of the request in flight before
+                # issuing the next one, the pair is request/reply
+                if pending is not None:
+                    collect()
+                # Only the buffer descriptor crosses the socket
+                self.video_processor.send_shm(chunk_idx, fill,
+                                              peaks=True,
+                                              heatmaps=self._heatmaps_flag)
+                pending = frames
+                pending_epoch = epoch
+                sent_at = perf_counter()
+                frames = []
+                chunk_idx ^= 1
+                fill = 0
+            elif flush and pending is not None:
+                collect()
+
+    def _mux_loop(self):
+        """
+        Muxer stage. Zips raw frames with their processing results
+        into MetaFrame objects. The blocking put on the bounded
+        _meta_frames queue is the back-pressure: when the player
+        falls behind the whole pipeline stalls here.
+        """
+        while not self._stop_ev.is_set():
+            try:
+                epoch, frames, result = self._processed.get(timeout=0.1)
+            except Empty:
+                continue
+
+            # Results from before a seek are never painted
+            if result is None or epoch != self._epoch:
+                continue
+
+            # take peaks from the result
+            peaks = result["peaks"]
+            heatmaps = result.get("heatmaps")
+
+            # Create Frame object for each result and add to _frames queue
+            for i in range(len(frames)):
+                if heatmaps is not None:
+                    frame = MetaFrame(frame=frames[i],
+                                      peaks=peaks[i],
+                                      heatmap=heatmaps[i])
                 else:
-                    self._frame_index += 1
+                    frame = MetaFrame(frame=frames[i],
+                                      peaks=peaks[i])
+                self._meta_frames.put(frame)
 
-                # If frame is grabed from video reader
-                # Add frames to the buffer for processing with chunk
-                if grabbed:
-                    self._buffer.append(frame[:, :, :1])
-
-                result = None
-
-                # If size of the buffer bigger than the chunk size
-                # or if we reached end of the file and the size of the
-                # buffer bigger than 0, process the frames
-                if len(self._buffer) >= self._chunk_size or \
-                        (not grabbed and len(self._buffer) >= 0):
-
-                    # Try to get processed frames from processing server
-                    result = self.video_processor.recv()
-
-                    # Keeps raw frames as global for adding to _frames
-                    frames = []
-
-                    # If the results ready from the processing server
-                    if result is not None:
-                        result_length = len(result["peaks"])
-                        # Take the processed raw frames
-                        frames = self._buffer[:result_length]
-                        # Remove them from the buffer.
-                        self._buffer = self._buffer[result_length:]
-
-                    # Try to get a chunk from buffer
-                    chunk = None
-                    # If buffer size bigger than the chunk size
-                    # Take the chunk and send it to the video processor
-                    if len(self._buffer) >= self._chunk_size:
-                        self.video_processor.send(np.stack(self._buffer[:self._chunk_size], axis=0),
-                                                  peaks=True,
-                                                  heatmaps=self._heatmaps_flag)
-                    # If the buffer size lower than the chunk size and
-                    # we reached end of the file, take the rest
-                    elif len(self._buffer) > 0 and not grabbed:
-                        self.video_processor.send(np.stack(self._buffer[:], axis=0),
-                                                  peaks=True,
-                                                  heatmaps=self._heatmaps_flag)
-                    # If there is no frame in the _buffer just continue to
-                    # wait in the loop until somebody changed the _run_flag
-                    # or changed the _frame_index.
-                    else:
-                        time.sleep(0.1)
-                        continue
-
-                    if result is not None:
-                        # take peaks from the result
-                        peaks = result["peaks"]
-                        heatmaps = None
-                        if "heatmaps" in result:
-                            heatmaps = result["heatmaps"]
-
-                        # Create Frame object for each result and add to _frames queue
-                        for i in range(len(frames)):
-                            if heatmaps is not None:
-                                frame = MetaFrame(frame=frames[i],
-                                                peaks=peaks[i],
-                                                heatmap=heatmaps[i])
-                            else:
-                                frame = MetaFrame(frame=frames[i],
-                                                  peaks=peaks[i])
-                            self._meta_frames.put(frame)
+    def _adapt_chunk_size(self, length, elapsed):
+        """
+        Steers the chunk size towards the target request latency.
+        Inference cost per frame shrinks with larger batches, so
+        the size grows until one request costs about a display
+        frame. Only measurements more than 25% off the current
+        size change it, hysteresis against oscillation.
+
+        Args:
+            length: Number of frames in the measured request
+            elapsed: Seconds between send and received reply
+        """
+        if not self._auto_chunk or length == 0:
+            return
+        per_frame = elapsed / length
+        ideal = self.TARGET_LATENCY / max(per_frame, 1e-5)
+        if ideal > self._chunk_size * 1.25 or ideal < self._chunk_size * 0.8:
+            self._chunk_size = int(min(self.MAX_CHUNK,
+                                       max(self.MIN_CHUNK, round(ideal))))
+
+    def _drain_queues(self):
+        """Empties all stage queues after a seek."""
+        for stage_queue in (self._raw_frames, self._processed, self._meta_frames):
+            stage_queue.clear()
 
     def read(self) -> MetaFrame:
         """Reads next frame in _frames queue"""
@@ -177,17 +359,20 @@ class VideoComposer:
         """
         # Set _frame_index
         self._frame_index = frame_index
-        # Set _frame_index_changed flag
-        self._frame_index_changed = True
-        # Set _rest_buffer_flag
-        self._reset_buffer_flag = True
+        # Invalidate everything read before this seek
+        self._epoch += 1
+        # Signal the reader, wakes it immediately if it idles at
+        # end of file
+        self._seek_ev.set()
 
     def toggle_heatmap(self):
         """Toggle _heatmaps_flag"""
         self._heatmaps_flag = not self._heatmaps_flag
 
     def stop(self):
-        # Set _run_flag as False to exit thread loop
-        self._run_flag = False
-        time.sleep(1)
+        # Signal the stage loops to exit and wait for them instead
+        # of sleeping a fixed second
+        self._stop_ev.set()
+        for thread in self._threads:
+            thread.join(timeout=1)
         self.video_processor.stop()
@@ -6,7 +6,7 @@ processor objects and video player.
 """
 
 from PySide2.QtCore import QThread, Signal
-import time
+from threading import Event
 
 from zerosleap.comp.processor import TrackProcessor
 from zerosleap.gui.composer import VideoComposer
@@ -19,20 +19,15 @@ class VideoController(QThread):
     controlling user interactions.
 
     Signals:
-        scene_changed: Emitter for updating scene plot
-        tracks_updated: Emitter for updating track table
+        frame_ready: Emitter packing scene, tracks and seeker value
+            into one cross-thread event per frame
         player_paused: Emitter for updating player status as paused
-        seeker_value_updated: Emitter for updating seeker value
         seeker_range_updated: Emitter for updating seeker range
-        server_stats_updated: Emitter for updating server stats
     """
 
-    scene_changed = Signal(MetaFrame)
-    tracks_updated = Signal(dict)
+    frame_ready = Signal(MetaFrame, int)
     player_paused = Signal(bool)
-    seeker_value_updated = Signal(int)
     seeker_range_updated = Signal(int)
-    server_stats_updated = Signal(str, str)
 
     def __init__(self, file_name: str):
         """
@@ -46,13 +41,18 @@ class VideoController(QThread):
         # Track processor for processing peak data for each iteration
         self._track_processor = TrackProcessor(9998)
 
-        self._run_flag = True
+        # Set to exit the thread loop; an event wakes the loop
+        # immediately instead of a polled bool
+        self._stop_ev = Event()
 
-        # Start the SceneComposer with a given file name and chunk_size.
-        # If GPU available chunk size can be increased for more smooth
-        # user experience. Also can be used with CPU but should be adjusted
-        # carefully. Automatically adjusting chunk size according to processing speed!
-        self._composer = VideoComposer(file_name, chunk_size=1).start()
+        # Wakes the paused loop when a seek or stop arrives
+        self._wake_ev = Event()
+
+        # Start the SceneComposer with a given file name. The chunk
+        # size is left in automatic mode: the composer measures the
+        # processing round trip and adjusts the batch size itself,
+        # which suits both GPU and CPU inference.
+        self._composer = VideoComposer(file_name).start()
 
         # Keeps the current status of the player paused or not
         self._paused = False
@@ -60,6 +60,11 @@ class VideoController(QThread):
         # Keeps a _frame_index number for video controller
         self._frame_index = 0
 
+        # Seek generation counter, mirrors the composer's epoch: a
+        # seek bumps it so the track reply still in flight for a
+        # pre-seek frame is drained instead of emitted
+        self._seek_epoch = 0
+
     def run(self):
         # Initialize and emit the seeker range to show correctly
         self.seeker_range_updated.emit(int(self._composer.video_reader.frames_count))
@@ -68,14 +73,26 @@ class VideoController(QThread):
         # this flag will be set to reinit processors
         self._frame_index_changed = False
 
-        # Thread loop, continues to work until _run_flag is False
-        while self._run_flag == True:
+        # Meta frame whose track request is in flight. Sending the
+        # next frame's peaks before collecting the previous reply
+        # overlaps the tracker IPC with the Qt emits and repaint,
+        # at the cost of the scene lagging the tracker by one frame.
+        pending = None
+
+        # Epoch the pending frame was sent in; a mismatch with the
+        # current epoch means a seek happened while its reply was
+        # in flight
+        pending_epoch = self._seek_epoch
+
+        # Thread loop, continues to work until stop is signalled
+        while not self._stop_ev.is_set():
 
             if self._paused:
                 # If video player paused, but _frame_index not changed
-                # Just sleep and continue to next loop
+                # wait until a seek or stop wakes us
                 if not self._frame_index_changed:
-                    time.sleep(0.1)
+                    self._wake_ev.wait(0.1)
+                    self._wake_ev.clear()
                     continue
                 # If vide player paused and _frame_index_changed
                 # Keep working for this loop and show the current frame
@@ -86,35 +103,66 @@ class VideoController(QThread):
             meta_frame = self._composer.read()
 
             if meta_frame is not None:
-                # Process tracks according to the scene (peaks)
-                self._track_processor.send(meta_frame.peaks)
-
-                # Update the tracks in the scene
-                meta_frame.tracks = self._track_processor.recv["tracks"]
-
-                if self._frame_index % 24 == 0:
-                    # Update tracks table at each 24 frames (second)
-                    self.tracks_updated.emit(meta_frame.tracks)
-
-                    # Update server metrics
-                    self.server_stats_updated.emit(self._composer.video_processor.server_summary(),
-                                                   self._track_processor.server_summary())
+                # Epoch this frame belongs to, read before the send
+                # so a concurrent seek marks the request stale
+                epoch = self._seek_epoch
 
-                # Emit the scene data for redrawing
-                self.scene_changed.emit(meta_frame)
+                # Request tracks for this frame; the reply is
+                # collected on the next iteration
+                self._track_processor.send(meta_frame.peaks)
 
-                # If not reached to the end of file (eof), increase the _frame_index
-                # and update the seeker
-                if self._frame_index < self._composer.video_reader.frames_count:
-                    self._frame_index += 1
-                    self.seeker_value_updated.emit(self._frame_index)
+                if pending is not None:
+                    if pending_epoch != self._seek_epoch:
+                        # A seek happened while the reply was in
+                        # flight: the frame is pre-seek and its
+                        # tracks come from the pre-reset tracker,
+                        # drain the reply without emitting it
+                        self._track_processor.drain()
+                    else:
+                        # Collect the previous frame's tracks
+                        result = self._track_processor.recv()
+                        pending.tracks = result["tracks"]
+
+                        # If not reached to the end of file (eof), increase the _frame_index
+                        if self._frame_index < self._composer.video_reader.frames_count:
+                            self._frame_index += 1
+
+                        # One packed emit per frame instead of separate
+                        # scene, tracks and seeker signals; the player
+                        # dispatches the pieces on the GUI side, where
+                        # the scene and tracks flushes are coalesced by
+                        # timers anyway
+                        self.frame_ready.emit(pending, self._frame_index)
+
+                pending = meta_frame
+                pending_epoch = epoch
 
             # If reached end of the file (eof)
             if self._frame_index >= self._composer.video_reader.frames_count-1:
+                # Flush the frame parked in pending, otherwise the
+                # video's last frame would never reach the player
+                if pending is not None:
+                    if pending_epoch == self._seek_epoch:
+                        result = self._track_processor.recv()
+                        pending.tracks = result["tracks"]
+                        self.frame_ready.emit(pending, self._frame_index)
+                    else:
+                        self._track_processor.drain()
+                    pending = None
+
                 # Change player status as _pause
                 self._paused = True
                 self.player_paused.emit(True)
 
+    def server_summaries(self) -> tuple:
+        """
+        Returns the video and track processing server summaries.
+        Reads only the shared metrics arrays, cheap enough to call
+        from the GUI thread on a timer.
+        """
+        return (self._composer.video_processor.server_summary(),
+                self._track_processor.server_summary())
+
     def set_frame(self, frame_index: int):
         """
         Changes frame index manually. Activates with
@@ -124,6 +172,9 @@ class VideoController(QThread):
             frame_index: target frame index number for seeking
         """
 
+        # Invalidate the track reply in flight before anything else
+        self._seek_epoch += 1
+
         # Just reset the track_processor and all track models.
         self._track_processor.reset_tracks()
 
@@ -136,11 +187,15 @@ class VideoController(QThread):
         # Set _frame_index_changed flag
         self._frame_index_changed = True
 
+        # Wake the loop if it waits in the paused state
+        self._wake_ev.set()
+
     def stop(self):
         """Make the thread exit from loop and close safely."""
-        # Set _run_flag as False
-        self._run_flag = False
-        time.sleep(0.1)
+        # Signal the loop to exit and wait for it
+        self._stop_ev.set()
+        self._wake_ev.set()
+        self.wait(1000)
 
         # Stop the composer
         self._composer.stop()
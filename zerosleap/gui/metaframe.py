@@ -1,6 +1,3 @@
-import numpy as np
-
-
 class MetaFrame:
     """
     MetaFrame object is keeps just one moment of the produced scene.
@@ -8,16 +5,17 @@ class MetaFrame:
     additional data.
 
     Attributes:
-        frame: Raw video frame.
-        peaks: Peaks extracted from heatmap.
-        heatmap: Processed frame with inference model.
-        tracks: Track traces over time.
+        frame: Raw video frame as np.ndarray.
+        peaks: Peaks extracted from heatmap as one contiguous
+            [n_peaks, 2] np.ndarray of point rows.
+        heatmap: Processed frame with inference model as np.ndarray.
+        tracks: Track traces over time as dict.
     """
 
-    frame: np.ndarray
-    heatmap: np.ndarray
-    peaks: dict
-    tracks: dict
+    # One MetaFrame is allocated per frame; slots drop the per
+    # instance __dict__ and make the hot attribute reads in the
+    # controller loop direct
+    __slots__ = ("frame", "heatmap", "peaks", "tracks")
 
     def __init__(self, frame, peaks, tracks=None, heatmap=None):
         self.frame = frame
@@ -3,13 +3,17 @@ Video player widget for showing video and other informations
 on the video.
 """
 
+from collections import defaultdict
+
+import numpy as np
+
 from PySide2 import QtGui
 from PySide2.QtWidgets import QWidget, QLabel, QVBoxLayout, QPushButton, QStyle, QSlider, QHBoxLayout, \
     QFileDialog, QSizePolicy
-from PySide2.QtGui import QPixmap, QFont, QIcon, QPainter, QColor
-from PySide2.QtCore import Qt, QSize
+from PySide2.QtGui import QFont, QIcon, QPainter, QPolygonF
+from PySide2.QtCore import Qt, QSize, QTimer, QPointF
 
-from zerosleap.gui.utils import get_random_color, convert_cv_qt
+from zerosleap.gui.utils import get_qcolor, convert_cv_qt, PALETTE_SIZE
 from zerosleap.gui.controller import VideoController
 
 
@@ -25,6 +29,9 @@ class VideoPlayer(QWidget):
         self.display_height = 800
         self.main_window = main_window
 
+        # Controller of the open video, None until a file is opened
+        self._video_controller = None
+
         btn_size = QSize(16, 16)
 
         # Open button for opening video files
@@ -96,6 +103,34 @@ class VideoPlayer(QWidget):
 
         self.setLayout(layout)
 
+        # Pens are created once and reused; drawing switches between
+        # them per color bucket instead of allocating and recoloring
+        # a pen per track per frame
+        self._peaks_pen = QtGui.QPen()
+        self._peaks_pen.setWidth(2)
+        self._peaks_pen.setColor(QtGui.QColor(204, 0, 0))
+        self._track_pens = []
+        for i in range(PALETTE_SIZE):
+            pen = QtGui.QPen(get_qcolor(i))
+            pen.setWidth(2)
+            self._track_pens.append(pen)
+
+        # Scene repaints are coalesced: the scene_changed slot only
+        # stores the latest meta frame and this timer renders it at
+        # most once per 16 ms (~60 Hz). When the decoder outruns the
+        # display, intermediate frames are dropped instead of
+        # queueing paint events the GUI thread cannot keep up with.
+        self._pending_frame = None
+        # Last rendered scene, reused when the same meta frame comes
+        # around again while paused
+        self._last_meta_frame = None
+        self._last_scene_key = None
+        self._last_pixmap = None
+        self._scene_timer = QTimer(self)
+        self._scene_timer.setInterval(16)
+        self._scene_timer.timeout.connect(self._flush_scene)
+        self._scene_timer.start()
+
     def open_video_file(self):
         """Shows dialog for opening a video file"""
         file_name, _ = QFileDialog.getOpenFileName(self, "Select the media.",
@@ -103,19 +138,19 @@ class VideoPlayer(QWidget):
 
         if file_name != '':
             # If video already loaded restart worker
-            if hasattr(self, "_video_controller"):
+            if self._video_controller is not None:
                 self._video_controller.stop()
                 self._video_controller.wait()
 
             self._video_controller = VideoController(file_name)
 
             # Connect video controller signals to functions
-            self._video_controller.scene_changed.connect(self.update_scene)
-            self._video_controller.tracks_updated.connect(self.main_window.update_track_viewer)
+            self._video_controller.frame_ready.connect(self.update_frame)
             self._video_controller.player_paused.connect(self.pause)
             self._video_controller.seeker_range_updated.connect(self.seeker_range_update)
-            self._video_controller.seeker_value_updated.connect(self.seeker_value_update)
-            self._video_controller.server_stats_updated.connect(self.main_window.update_server_stats)
+
+            # The status bar polls server stats from this controller
+            self.main_window.set_stats_source(self._video_controller)
 
             # Start the thread
             self._video_controller.start()
@@ -128,7 +163,7 @@ class VideoPlayer(QWidget):
 
     def closeEvent(self, event) -> None:
         # If has _video_controller close it.
-        if hasattr(self, "_video_controller"):
+        if self._video_controller is not None:
             self._video_controller.stop()
         event.accept()
 
@@ -145,15 +180,6 @@ class VideoPlayer(QWidget):
         """
         self.seeker.setRange(0, max_range)
 
-    def seeker_value_update(self, value):
-        """
-        Sets slider value. Updates for each frame
-
-        Args:
-            value: New value of the slider
-        """
-        self.seeker.setValue(value)
-
     def seeker_slider_moved(self, p):
         """
         Changes controller active frame number if slider moved
@@ -165,24 +191,24 @@ class VideoPlayer(QWidget):
 
     def play(self):
         """Play button action"""
-        if hasattr(self, "_video_controller"):
+        if self._video_controller is not None:
             self._video_controller._paused = False
             self.play_mode(play=True)
 
     def pause(self):
         """Pause button action"""
-        if hasattr(self, "_video_controller"):
+        if self._video_controller is not None:
             self._video_controller._paused = True
             self.play_mode(play=False)
 
     def next(self):
         """Next button action"""
-        if hasattr(self, "_video_controller"):
+        if self._video_controller is not None:
             self._video_controller.set_frame(self.seeker.value() + 1)
 
     def back(self):
         """Next button action"""
-        if hasattr(self, "_video_controller"):
+        if self._video_controller is not None:
             self._video_controller.set_frame(self.seeker.value() - 1)
 
     # Changes video player controls according to the video player status
@@ -198,7 +224,29 @@ class VideoPlayer(QWidget):
         self.next_button.setEnabled(not play)
         self.back_button.setEnabled(not play)
 
-    def update_scene(self, meta_frame):
+    def update_frame(self, meta_frame, seeker_value):
+        """
+        Dispatches one packed frame update: buffers the scene for
+        the coalescing timer, forwards the tracks to the tracks
+        view buffer and moves the seeker.
+
+        Args:
+            meta_frame: MetaFrame Object
+            seeker_value: Frame index for the seeker
+        """
+        self._pending_frame = meta_frame
+        self.main_window.update_track_viewer(meta_frame.tracks)
+        self.seeker.setValue(seeker_value)
+
+    def _flush_scene(self):
+        """Render the buffered meta frame, if any."""
+        meta_frame = self._pending_frame
+        if meta_frame is None:
+            return
+        self._pending_frame = None
+        self._render_scene(meta_frame)
+
+    def _render_scene(self, meta_frame):
         """
         Updates the image_label with a new opencv image.
 
@@ -206,6 +254,15 @@ class VideoPlayer(QWidget):
             meta_frame: MetaFrame Object
         """
 
+        # While paused the same meta frame can be delivered again by
+        # repaint requests; reuse the rendered pixmap unless the
+        # display options or the label geometry changed meanwhile
+        key = (self.main_window.display_options_version,
+               self.image_label.width(), self.image_label.height())
+        if meta_frame is self._last_meta_frame and key == self._last_scene_key:
+            self.image_label.setPixmap(self._last_pixmap)
+            return
+
         # Get frame and other data from meta_frame
         frame = meta_frame.frame
         peaks = meta_frame.peaks
@@ -221,67 +278,65 @@ class VideoPlayer(QWidget):
         # Adjust the scale factor
         scale_factor = self.display_height / 256
 
-        # Convert frame to qt image
+        # Convert frame to a qt pixmap, painting happens on the
+        # pixmap directly
         pm_img = convert_cv_qt(frame, self.display_width, self.display_height)
 
         # Start painter
         painter = QPainter()
         painter.begin(pm_img)
 
-        # Create pen
-        pen = QtGui.QPen()
-        pen.setWidth(2)
-        pen.setColor(QtGui.QColor(204, 0, 0))  # r, g, b
-        painter.setPen(pen)
+        painter.setPen(self._peaks_pen)
 
-        if display_options["show_tracks"] == True:
-            # Plot peaks with centered
-            for point in peaks:
-                painter.drawEllipse((point[0] * scale_factor)-4,
-                                    (point[1] * scale_factor)-4, 8, 8)
+        if display_options["show_tracks"] == True and len(peaks):
+            # Plot peaks with centered, scaled in one numpy multiply
+            scaled = np.asarray(peaks, dtype=np.float32) * scale_factor - 4
+            for x, y in scaled.tolist():
+                painter.drawEllipse(x, y, 8, 8)
 
-        pen.setWidth(2)
-        pen.setColor(QtGui.QColor(0, 0, 255))
+        show_labels = display_options["show_labels"]
+        show_traces = display_options["show_traces"]
 
-        if display_options["show_labels"] == True:
-            # Draw tracked objects labels
-            for label, trace in tracks.items():
-                if len(trace) > 1:
-                    # Assign random color for different tracks.
-                    color = get_random_color(int(label))
-                    qcolor = QColor()
-                    qcolor.setNamedColor(color)
-                    pen.setColor(qcolor)
-                    painter.setPen(pen)
-                    label = label
-                    label_pos_x = trace[-1][0][0] * scale_factor + 10
-                    label_pos_y = trace[-1][0][1] * scale_factor + 10
-                    painter.drawText(label_pos_x, label_pos_y, label)
-
-        if display_options["show_traces"] == True:
-            # For identified object tracks draw tracking line
-            # Use various colors to indicate different track_id
+        if show_labels or show_traces:
+            # Bucket tracks with drawable traces by palette color,
+            # one pen switch per color instead of per track
+            buckets = defaultdict(list)
             for label, trace in tracks.items():
                 if len(trace) > 1:
-                    # Assign random color for different tracks.
-                    color = get_random_color(int(label))
-                    qcolor = QColor()
-                    qcolor.setNamedColor(color)
-                    pen.setColor(qcolor)
-                    painter.setPen(pen)
-                    limit = 0
-                    if len(trace) > 200:
-                        limit = len(trace) - 200
-                    for j in range(limit, len(trace) - 1):
-                        # Draw trace line
-                        x1 = trace[j][0][0] * scale_factor
-                        y1 = trace[j][0][1] * scale_factor
-                        x2 = trace[j + 1][0][0] * scale_factor
-                        y2 = trace[j + 1][0][1] * scale_factor
-                        painter.drawLine(int(x1), int(y1), int(x2), int(y2))
+                    buckets[int(label) % PALETTE_SIZE].append((label, trace))
+
+            # Single pass over the buckets draws both the label and
+            # the trace of each track, instead of iterating the
+            # tracks dict once per display option
+            for color_idx, items in buckets.items():
+                painter.setPen(self._track_pens[color_idx])
+                for label, trace in items:
+                    if show_labels:
+                        # Draw tracked object label. The pickled
+                        # tracks dict keeps its int keys, drawText
+                        # only accepts text
+                        label_pos_x = trace[-1][0][0] * scale_factor + 10
+                        label_pos_y = trace[-1][0][1] * scale_factor + 10
+                        painter.drawText(label_pos_x, label_pos_y, str(label))
+
+                    if show_traces:
+                        # Draw tracking line with the track's color
+                        limit = 0
+                        if len(trace) > 200:
+                            limit = len(trace) - 200
+                        # One vectorized multiply instead of four Python
+                        # float operations per segment
+                        pts = np.asarray(trace[limit:], dtype=np.float32)[:, 0, :] * scale_factor
+                        # One polyline submission per track instead of a
+                        # Python to Qt call per segment
+                        poly = QPolygonF([QPointF(x, y) for x, y in pts.tolist()])
+                        painter.drawPolyline(poly)
 
         painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
-        # painter.drawImage(0, 0, pix_map)
         painter.end()
-        # label = QLabel()
-        self.image_label.setPixmap(QPixmap.fromImage(pm_img))
+        self.image_label.setPixmap(pm_img)
+
+        # Keep the rendered scene for repeat deliveries of the frame
+        self._last_meta_frame = meta_frame
+        self._last_scene_key = key
+        self._last_pixmap = pm_img
@@ -1,19 +1,33 @@
 import cv2
 import numpy as np
 from PySide2 import QtGui
-from PySide2.QtCore import Qt
-from PySide2.QtGui import QImage
+from PySide2.QtGui import QColor, QImage, QPixmap
+
+# Stable color palette shared by the color helpers
+_COLORS = [
+    '#FF0000', '#FFFF00', '#00FF00', '#0000FF', '#00FFFF', '#FF00FF', '#FFA500',
+    '#AFEEEE', '#8B008B', '#FF69B4', '#FFFACD', '#DEB887', '#F0FFF0', '#B0C4DE',
+]
+
+# QColor per palette entry, parsed once instead of a named-color
+# string parse per draw call
+_QCOLORS = [QColor(c) for c in _COLORS]
+
+# Number of distinct palette colors, for callers that bucket by color
+PALETTE_SIZE = len(_COLORS)
 
 
 def get_random_color(obj_id):
     """Defines different and stable color for each obj_id"""
 
-    colors = [
-        '#FF0000', '#FFFF00', '#00FF00', '#0000FF', '#00FFFF', '#FF00FF', '#FFA500',
-        '#AFEEEE', '#8B008B', '#FF69B4', '#FFFACD', '#DEB887', '#F0FFF0', '#B0C4DE',
-    ]
+    return _COLORS[obj_id % len(_COLORS)]
+
+
+def get_qcolor(obj_id) -> QColor:
+    """Returns the stable QColor of an obj_id, same palette as
+    get_random_color without the string parse per call"""
 
-    return colors[obj_id % len(colors)]
+    return _QCOLORS[obj_id % len(_QCOLORS)]
 
 
 def hhmmss(frame, fps=24):
@@ -25,12 +39,35 @@ def hhmmss(frame, fps=24):
     return ("%d:%02d:%02d" % (h, m, s)) if h else ("%d:%02d" % (m, s))
 
 
-def convert_cv_qt(cv_img: np.ndarray, display_width: int, display_height: int) -> QImage:
+# Reused conversion buffers keyed by source shape and display
+# geometry, reallocated only when either changes
+_cv_qt_bufs = {}
+
+
+def convert_cv_qt(cv_img: np.ndarray, display_width: int, display_height: int) -> QPixmap:
     """Convert from an opencv image to QPixmap"""
 
-    rgb_image = cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGBA)
-    h, w, ch = rgb_image.shape
-    bytes_per_line = ch * w
-    qimage = QtGui.QImage(rgb_image.data, w, h, bytes_per_line, QtGui.QImage.Format_ARGB32)
-    qimage_scaled = qimage.scaled(display_width, display_height, Qt.KeepAspectRatio)
-    return qimage_scaled
+    h, w = cv_img.shape[:2]
+    # Keep the aspect ratio like qimage.scaled did
+    scale = min(display_width / w, display_height / h)
+    dw = max(int(w * scale), 1)
+    dh = max(int(h * scale), 1)
+
+    key = (cv_img.shape, dw, dh)
+    bufs = _cv_qt_bufs.get(key)
+    if bufs is None:
+        bufs = (np.empty((h, w, 4), dtype=np.uint8),
+                np.empty((dh, dw, 4), dtype=np.uint8))
+        _cv_qt_bufs[key] = bufs
+    rgba_buf, scaled_buf = bufs
+
+    # Convert and scale into the reused buffers, no per-frame
+    # H*W*4 allocations
+    cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGBA, dst=rgba_buf)
+    cv2.resize(rgba_buf, (dw, dh), dst=scaled_buf, interpolation=cv2.INTER_LINEAR)
+
+    # The QImage wraps the reused buffer without owning it; the
+    # fromImage conversion is the single copy that crosses into Qt,
+    # so reusing the numpy buffer on the next call is safe
+    qimage = QtGui.QImage(scaled_buf.data, dw, dh, 4 * dw, QtGui.QImage.Format_ARGB32)
+    return QPixmap.fromImage(qimage)
@@ -0,0 +1,39 @@
+"""
+Jitted Kalman filter steps.
+
+filterpy's predict/update are pure Python with many attribute
+lookups and temporary arrays per call, which dominates the tracker
+update loop when many tracks are live. The free functions below do
+the same algebra (including the Joseph form covariance update
+filterpy uses) on the filter's own arrays in place. When numba is
+missing the tracks keep calling filterpy.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    KALMAN_JIT = True
+except ImportError:
+    KALMAN_JIT = False
+
+
+if KALMAN_JIT:
+    @njit(cache=True)
+    def predict(x, P, F, Q):
+        """In place predict step: x = Fx, P = FPF' + Q."""
+        x[:] = F @ x
+        P[:] = F @ P @ F.T + Q
+
+    @njit(cache=True)
+    def update(x, P, H, R, z):
+        """
+        In place update step with measurement z and measurement
+        function H, Joseph form covariance update.
+        """
+        y = z - H @ x
+        S = H @ P @ H.T + R
+        K = P @ H.T @ np.linalg.inv(S)
+        x[:] = x + K @ y
+        I_KH = np.eye(P.shape[0]) - K @ H
+        P[:] = I_KH @ P @ I_KH.T + K @ R @ K.T
@@ -0,0 +1,38 @@
+"""
+Jitted tracking kernels.
+
+The distance matrix between detections and single point tracks is a
+tight numeric loop; when numba is installed it runs as a parallel
+fused kernel that clamps above-threshold entries in the same pass.
+The tracker falls back to scipy's cdist otherwise.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    KERNELS_JIT = True
+except ImportError:
+    KERNELS_JIT = False
+
+
+if KERNELS_JIT:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def euclid_clamp(dets, estimates, threshold, out):
+        """
+        Pairwise euclidean distances with the threshold clamp fused
+        in: entries above the threshold are written as threshold + 1
+        directly, no second pass over the matrix.
+
+        Args:
+            dets: Detection points [n_det x 2] float32
+            estimates: Track estimate points [n_trk x 2] float32
+            threshold: Distance threshold
+            out: Output distance matrix [n_det x n_trk] float32
+        """
+        for i in prange(dets.shape[0]):
+            for j in range(estimates.shape[0]):
+                dx = dets[i, 0] - estimates[j, 0]
+                dy = dets[i, 1] - estimates[j, 1]
+                d = np.sqrt(dx * dx + dy * dy)
+                out[i, j] = d if d < threshold else threshold + 1
@@ -6,6 +6,8 @@ import math
 import numpy as np
 from filterpy.kalman import KalmanFilter
 
+from zerosleap.processing.tracking import _kalman
+
 
 class Detection:
     """
@@ -29,9 +31,15 @@ class Track:
 
     count = 0
 
+    # Filter template matrices keyed by points_count; every track
+    # with the same point count copies the template instead of
+    # rebuilding it with a Python loop
+    _F_cache = {}
+    _H_cache = {}
+
     def __init__(
             self,
-            detections,
+            points,
             min_drop_life,
             max_drop_life,
             confidence_threshold,
@@ -43,7 +51,11 @@ class Track:
         self.confidence_threshold = confidence_threshold
 
         # Number of points detected
-        self.points_count = validate_points_shape(detections.points).shape[0]
+        self.points_count = validate_points_shape(points).shape[0]
+
+        # Single point tracks, the common zerosleap case, take a
+        # scalar fast path through add()
+        self._fast = self.points_count == 1
 
         # Minimum life of the undetected track before drop
         self.min_drop_life = min_drop_life
@@ -74,8 +86,8 @@ class Track:
         # Current min distance to detections
         self.current_min_distance = None
 
-        # Last detections
-        self.last_detection = detections
+        # Last detected points
+        self.last_points = points
 
         # Flag for not initialized tracks
         self.initializing_flag = True
@@ -84,7 +96,7 @@ class Track:
         self.id = None
 
         # Setup Kalman Filter
-        self.setup_filter(detections.points)
+        self.setup_filter(points)
 
         # Init detected-at_least_once_points with False
         self.detected_at_least_once_points = np.array([False] * self.points_count)
@@ -111,19 +123,30 @@ class Track:
         # Initialize the Kalman Filter
         self.filter = KalmanFilter(dim_x=dim_x, dim_z=dim_z)
 
-        # Define the F (State Transition Matrix)
-        self.filter.F = np.eye(dim_x)
-
-        # Update
-        dt = 1  # At each step we update pos with v * dt
-        for p in range(dim_z):
-            self.filter.F[p, p + dim_z] = dt
+        # Define the F (State Transition Matrix): identity plus a
+        # dt=1 diagonal coupling each position to its velocity,
+        # built vectorized on the first track of this point count
+        F = Track._F_cache.get(self.points_count)
+        if F is None:
+            F = np.eye(dim_x) + np.eye(dim_x, k=dim_z)
+            Track._F_cache[self.points_count] = F
+        self.filter.F = F.copy()
 
         # Define the H (Measurement Function)
-        self.filter.H = np.eye(
-            dim_z,
-            dim_x,
-        )
+        H = Track._H_cache.get(self.points_count)
+        if H is None:
+            H = np.eye(dim_z, dim_x)
+            Track._H_cache[self.points_count] = H
+        self.filter.H = H.copy()
+
+        # Reused measurement function for add(): only the diagonal
+        # of the position block changes per update, the velocity
+        # block stays zero, so one matrix serves every update
+        self._H = np.zeros((dim_z, dim_x))
+
+        # Reused measurement vector, refilled per update instead of
+        # the flatten/expand_dims/transpose allocation chain
+        self._z = np.empty((dim_z, 1))
 
         # Define the R (Measurement Uncertainty)
         self.filter.R *= 4.0
@@ -132,18 +155,34 @@ class Track:
         self.filter.Q[dim_z:, dim_z:] /= 10
 
         # Initial state: numpy.array(dim_x, 1)
-        self.filter.x[:dim_z] = np.expand_dims(detections.flatten(), 0).T
+        self.filter.x[:dim_z, 0] = detections.ravel()
 
         # Estimation uncertainty: numpy.array(dim_x, dim_x)
         self.filter.P[dim_z:, dim_z:] *= 10.0
 
+    def _filter_update(self):
+        """
+        Runs the filter update with the reused measurement vector
+        and function, through the jitted step when available.
+        """
+        if _kalman.KALMAN_JIT:
+            _kalman.update(self.filter.x, self.filter.P,
+                           self._H, self.filter.R, self._z)
+        else:
+            self.filter.update(self._z, None, self._H)
+
     def tracker_step(self):
         """Tracker step function to make filter predict"""
         self.detection_count -= 1
         self.point_detection_count -= 1
         self.age += 1
-        # Advances the tracker's state
-        self.filter.predict()
+        # Advances the tracker's state; the jitted step runs the
+        # same algebra in place without filterpy's Python overhead
+        if _kalman.KALMAN_JIT:
+            _kalman.predict(self.filter.x, self.filter.P,
+                            self.filter.F, self.filter.Q)
+        else:
+            self.filter.predict()
 
     @property
     def initializing(self):
@@ -179,36 +218,39 @@ class Track:
         positions = self.filter.x.T.flatten()[: self.dim_z].reshape(-1, 2)
         return positions
 
-    def add(self, detection: Detection):
+    def add(self, points: np.ndarray, confidence: np.ndarray = None):
         """
-        Adds the matched detection to the track and updates the filter.
-        Also updates all counts.
+        Adds the matched detection points to the track and updates
+        the filter. Also updates all counts. Raw coordinate arrays
+        are taken directly, no wrapper object is allocated on the
+        hot path.
 
         Args:
-            detection: Matched detection to be added the track
+            points: Matched detection points to be added the track
+            confidence: Optional per point confidence values
         """
-        points = validate_points_shape(detection.points)
+        points = validate_points_shape(points)
+
+        if self._fast:
+            return self._add_single_point(points, confidence)
 
-        self.last_detection = detection
+        self.last_points = points
         if self.detection_count < self.max_drop_life:
             self.detection_count += 2
 
         # If detection confidence is used to model track state
-        if detection.confidence is not None:
+        if confidence is not None:
 
             # Check the shape of the detection confidence
-            assert len(detection.confidence.shape) == 1
+            assert len(confidence.shape) == 1
 
             # Creates a mask for points confidence over confidence_threshold value
-            points_over_threshold_mask = detection.confidence > self.confidence_threshold
+            points_over_threshold_mask = confidence > self.confidence_threshold
 
-            # Generate the threshold mask
-            threshold_mask = np.array(
-                [[m, m] for m in points_over_threshold_mask]
-            ).flatten()
-
-            # Measurement function positions
-            H_pos = np.diag(threshold_mask).astype(float)
+            # Write the per coordinate mask onto the diagonal of the
+            # reused measurement function
+            np.fill_diagonal(self._H[:, :self.dim_z],
+                             np.repeat(points_over_threshold_mask, 2))
 
             # Increase the detected points count
             self.point_detection_count[points_over_threshold_mask] += 2
@@ -216,8 +258,8 @@ class Track:
             # Detection confidence is not used just create a mask with True values
             points_over_threshold_mask = np.array([True] * self.points_count)
 
-            # Measurement function positions
-            H_pos = np.identity(points.size)
+            # Every coordinate is measured
+            np.fill_diagonal(self._H[:, :self.dim_z], 1.0)
 
             # Increase the detected points count
             self.point_detection_count += 2
@@ -232,19 +274,13 @@ class Track:
         # Assign 0 to all points detection counts lower than 0
         self.point_detection_count[self.point_detection_count < 0] = 0
 
-        # Measurement function velocity
-        H_vel = np.zeros(H_pos.shape)
-
-        # Creates measurement function by stacking position and velocity parts
-        H = np.hstack([H_pos, H_vel])
-
-        # Adds a new measurement to the filter with provided measurement function
-        self.filter.update(np.expand_dims(points.flatten(), 0).T, None, H)
+        # Adds a new measurement to the filter with the reused
+        # measurement vector and function
+        self._z[:, 0] = points.ravel()
+        self._filter_update()
 
         # Creates a mask for detected points at least once
-        detected_at_least_once_mask = np.array(
-            [[m, m] for m in self.detected_at_least_once_points]
-        ).flatten()
+        detected_at_least_once_mask = np.repeat(self.detected_at_least_once_points, 2)
 
         # To prevent huge velocity vectors when first real detection occurs, force the
         # velocity = 0 for the first time.
@@ -255,6 +291,52 @@ class Track:
             self.detected_at_least_once_points, points_over_threshold_mask
         )
 
+    def _add_single_point(self, points: np.ndarray, confidence: np.ndarray = None):
+        """
+        Fast path of add() for single point tracks. The per point
+        mask arrays collapse to one bool, the measurement function
+        diagonal is two scalar writes and no intermediate array is
+        allocated.
+
+        Args:
+            points: Matched detection point, already validated
+            confidence: Optional confidence value of the point
+        """
+
+        self.last_points = points
+        if self.detection_count < self.max_drop_life:
+            self.detection_count += 2
+
+        if confidence is not None:
+            assert len(confidence.shape) == 1
+            detected = bool(confidence[0] > self.confidence_threshold)
+        else:
+            detected = True
+
+        # Two scalar writes replace the diagonal fill
+        measured = 1.0 if detected else 0.0
+        self._H[0, 0] = measured
+        self._H[1, 1] = measured
+
+        if detected:
+            self.point_detection_count[0] += 2
+
+        # Clamp the point detection count to its drop life window
+        if self.point_detection_count[0] >= self.point_max_drop_life:
+            self.point_detection_count[0] = self.point_max_drop_life
+        elif self.point_detection_count[0] < 0:
+            self.point_detection_count[0] = 0
+
+        # Adds the measurement with the reused vector and function
+        self._z[:, 0] = points[0]
+        self._filter_update()
+
+        # Force velocity to zero until the first real detection
+        if not self.detected_at_least_once_points[0]:
+            self.filter.x[self.dim_z:] = 0
+            if detected:
+                self.detected_at_least_once_points[0] = True
+
 
 def validate_points_shape(points: np.ndarray) -> np.ndarray:
     """
@@ -282,5 +364,23 @@ def validate_points_shape(points: np.ndarray) -> np.ndarray:
 
 
 # Distance function
-def centroid_distance(detection, tracked_object) -> np.ndarray:
-    return np.linalg.norm(detection.points - tracked_object.estimate)
+def centroid_distance(points, tracked_object) -> np.ndarray:
+    return np.linalg.norm(points - tracked_object.estimate)
+
+
+def batch_centroid_distance(detections: np.ndarray, estimates: np.ndarray) -> np.ndarray:
+    """
+    Centroid distance between every detection and every track
+    estimate in one broadcast, equivalent to calling
+    centroid_distance per (detection, track) pair.
+
+    Args:
+        detections: Detection points [n_det x 2]
+        estimates: Stacked track estimates [n_trk x points x 2]
+
+    Returns:
+        Distance matrix [n_det x n_trk]
+    """
+
+    diff = detections[:, np.newaxis, np.newaxis, :] - estimates[np.newaxis]
+    return np.sqrt((diff * diff).sum(axis=(-2, -1)))
@@ -1,6 +1,10 @@
 import numpy as np
+from scipy.optimize import linear_sum_assignment
+from scipy.spatial.distance import cdist
 
-from zerosleap.processing.tracking.track import Track, Detection
+from zerosleap.processing.tracking import _kernels
+from zerosleap.processing.tracking.track import Track, centroid_distance, \
+    batch_centroid_distance
 
 
 class Tracker:
@@ -35,7 +39,11 @@ class Tracker:
             confidence_threshold: Threshold for detections to be considered as real detection
         """
 
-        self.tracked_objects = []
+        # Live tracks split by state; tracks migrate between the
+        # lists when initialization finishes instead of the whole
+        # population being repartitioned every frame
+        self._active = []
+        self._initializing = []
         self.distance_function = distance_function
         self.min_drop_life = min_drop_life
         self.max_drop_life = max_drop_life
@@ -43,37 +51,69 @@ class Tracker:
         self.confidence_threshold = confidence_threshold
         Track.count = 0
 
-    def update(self, detections: Detection = None) -> list:
+    @property
+    def tracked_objects(self) -> list:
+        """All live tracks, active ones first."""
+        return self._active + self._initializing
+
+    def update(self, detections: np.ndarray = None) -> list:
         """
-        Update tracks according to the detections.
+        Update tracks according to the detected points. The points
+        are taken as raw coordinate rows, no per detection wrapper
+        object is allocated on the hot path.
 
         Args:
-            detections: Detected objects
+            detections: Detected points as numpy array [n x 2]
 
         Returns:
             List of already initialized tracked objects
         """
 
-        # Get the stable trackers that have momentum
-        self.tracked_objects = [o for o in self.tracked_objects if o.has_momentum]
-
-        # Update tracker
-        for obj in self.tracked_objects:
+        # Step each state list in place, dropping tracks without
+        # momentum and collecting the freshly predicted estimates as
+        # one contiguous coordinate block per state. Tracks whose
+        # initialization finished migrate to the active list here,
+        # so no cross-population repartition runs per frame.
+        kept_active = []
+        active_xy = []
+        for obj in self._active:
+            if not obj.has_momentum:
+                continue
+            obj.tracker_step()
+            kept_active.append(obj)
+            active_xy.append(obj.estimate)
+        self._active = kept_active
+
+        kept_init = []
+        init_xy = []
+        for obj in self._initializing:
+            if not obj.has_momentum:
+                continue
             obj.tracker_step()
+            if obj.initializing:
+                kept_init.append(obj)
+                init_xy.append(obj.estimate)
+            else:
+                # Initialization finished, migrate to active
+                self._active.append(obj)
+                active_xy.append(obj.estimate)
+        self._initializing = kept_init
 
         # Update already initialized tracked objects with detections
         unmatched_detections = self.update_tracks(
-            [o for o in self.tracked_objects if not o.initializing], detections
+            self._active, detections,
+            np.asarray(active_xy, dtype=np.float32) if active_xy else None
         )
 
         # Update not yet initialized tracked objects with yet unmatched detections
         unmatched_detections = self.update_tracks(
-            [o for o in self.tracked_objects if o.initializing], unmatched_detections
+            self._initializing, unmatched_detections,
+            np.asarray(init_xy, dtype=np.float32) if init_xy else None
         )
 
         # Create new tracked objects from remaining unmatched detections
         for detection in unmatched_detections:
-            self.tracked_objects.append(
+            self._initializing.append(
                 Track(
                     detection,
                     self.min_drop_life,
@@ -82,42 +122,101 @@ class Tracker:
                 )
             )
 
-        return [p for p in self.tracked_objects if not p.initializing]
+        # Matching can push a track over its initialization
+        # threshold; migrate those before reporting
+        still_initializing = []
+        for obj in self._initializing:
+            if obj.initializing:
+                still_initializing.append(obj)
+            else:
+                self._active.append(obj)
+        self._initializing = still_initializing
+
+        return list(self._active)
 
-    def update_tracks(self, tracks: [Track], detections: [Detection]) -> [Track]:
+    def update_tracks(self, tracks: [Track], detections, estimates: np.ndarray = None) -> list:
         """
-        Update tracks in place and returns unmatched detections
+        Update tracks in place and returns unmatched detection points
 
         Args:
             tracks: List of tracks to be matched
-            detections: List of detections to be matched
+            detections: Detection points to be matched, one row per detection
+            estimates: Optional prestacked track estimates
+                [n_trk x points x 2], collected by the caller's sweep
         """
 
-        if detections is not None and len(detections) > 0:
-
-            # Creates a distance matrix of ones for each detection and track
-            distance_matrix = np.ones((len(detections), len(tracks)), dtype=np.float32)
+        if len(tracks) == 0:
+            # Nothing to match against: every detection stays
+            # unmatched, no matrix work at all
+            if detections is None or len(detections) == 0:
+                return []
+            return np.ascontiguousarray(detections, dtype=np.float32)
 
-            # Scale the distance matrix with _distance_threshold
-            distance_matrix *= self._distance_threshold + 1
+        if detections is not None and len(detections) > 0:
 
-            for d, detection in enumerate(detections):
-                for t, track in enumerate(tracks):
-                    # Calculate the distance between each detection and track
-                    distance = self.distance_function(detection, track)
+            # One contiguous float32 array for the whole call; a
+            # no-op re-wrap when the caller already passes the slice
+            # from a previous matching round
+            detections = np.ascontiguousarray(detections, dtype=np.float32)
+
+            if tracks and self.distance_function is centroid_distance:
+                # All pairwise distances in one kernel instead of a
+                # Python distance call per (detection, track) pair
+                if estimates is None:
+                    estimates = np.stack([track.estimate for track in tracks])
+
+                # Validate the coordinates up front: the jitted
+                # kernel's fastmath folds nan into the clamp
+                # sentinel and the fallback clamp swallows inf, so
+                # the matrix check below cannot catch bad inputs on
+                # either path. Checking here keeps the behavior the
+                # same with and without numba.
+                if not (np.isfinite(detections).all()
+                        and np.isfinite(estimates).all()):
+                    raise ValueError(
+                        f"Distance function returned nan or inf value."
+                    )
 
-                    if distance > self._distance_threshold:
-                        distance_matrix[d, t] = self._distance_threshold + 1
+                if estimates.shape[1] == 1 and _kernels.KERNELS_JIT:
+                    # One point per track, the common case: the
+                    # jitted kernel fuses distance and clamp in a
+                    # single parallel pass
+                    distance_matrix = np.empty((len(detections), len(tracks)),
+                                               dtype=np.float32)
+                    _kernels.euclid_clamp(detections, estimates[:, 0, :],
+                                          np.float32(self._distance_threshold),
+                                          distance_matrix)
+                else:
+                    if estimates.shape[1] == 1:
+                        # cdist's C euclidean kernel beats the
+                        # broadcast subtraction and its temporary
+                        distance_matrix = cdist(detections, estimates[:, 0, :]).astype(np.float32)
                     else:
-                        distance_matrix[d, t] = distance
-
-            if np.isnan(distance_matrix).any():
-                raise ValueError(
-                    f"Distance function returned nan value."
-                )
-            if np.isinf(distance_matrix).any():
+                        distance_matrix = batch_centroid_distance(detections, estimates).astype(np.float32)
+                    distance_matrix[distance_matrix > self._distance_threshold] = \
+                        self._distance_threshold + 1
+            else:
+                # Creates the distance matrix prefilled with the
+                # above-threshold marker in one write pass
+                distance_matrix = np.full((len(detections), len(tracks)),
+                                          self._distance_threshold + 1,
+                                          dtype=np.float32)
+
+                for d, detection in enumerate(detections):
+                    for t, track in enumerate(tracks):
+                        # Calculate the distance between each detection and track
+                        distance = self.distance_function(detection, track)
+
+                        if distance > self._distance_threshold:
+                            distance_matrix[d, t] = self._distance_threshold + 1
+                        else:
+                            distance_matrix[d, t] = distance
+
+            # One streaming pass over the matrix instead of separate
+            # nan and inf scans
+            if not np.isfinite(distance_matrix).all():
                 raise ValueError(
-                    f"Distance function returned inf value."
+                    f"Distance function returned nan or inf value."
                 )
 
             # Update tracks current_min_distance for checking
@@ -133,9 +232,11 @@ class Tracker:
             )
 
             if len(matched_det_indices) > 0:
-                # Create unmatched_detections
-                unmatched_detections = [
-                    d for i, d in enumerate(detections) if i not in matched_det_indices
+                # Collect unmatched indices; set membership keeps
+                # this O(1) per detection instead of a list scan
+                matched_set = set(matched_det_indices)
+                unmatched_indices = [
+                    i for i in range(len(detections)) if i not in matched_set
                 ]
 
                 # Handle matched tracks/detections
@@ -143,18 +244,21 @@ class Tracker:
                     matched_det_indices, matched_track_indices
                 ):
                     match_distance = distance_matrix[match_det_idx, match_track_idx]
-                    matched_detection = detections[match_det_idx]
                     matched_tracks = tracks[match_track_idx]
 
                     if match_distance < self._distance_threshold:
                         # If match distance lower than the _distance_threshold
                         # Update last distance
-                        matched_tracks.add(matched_detection)
+                        matched_tracks.add(detections[match_det_idx])
                         matched_tracks.last_distance = match_distance
                     else:
-                        # If distance higher than the threshold add the detection
-                        # to unmatched_detections
-                        unmatched_detections.append(matched_detection)
+                        # If distance higher than the threshold the
+                        # detection stays unmatched
+                        unmatched_indices.append(match_det_idx)
+
+                # Slice the unmatched rows out of the contiguous
+                # array in one take
+                unmatched_detections = detections[unmatched_indices]
             else:
                 # If there is no detected matches,
                 # add all detections to unmatched_detections.
@@ -170,6 +274,9 @@ class Tracker:
     def match(self, distance_matrix: np.ndarray) -> [list, list]:
         """
         Matches detections with tracked_objects from a distance matrix
+        with the exact linear sum assignment solver. Replaces the
+        greedy minimum loop, which rescanned the whole matrix per
+        match and could pick suboptimal pairs.
 
         Args:
              distance_matrix: Distance matrix between tracked_objects and detections
@@ -178,29 +285,13 @@ class Tracker:
              det_ids: List of matched detection indexes
              track_ids: List of matched track indexes
         """
-        distance_matrix = distance_matrix.copy()
         if distance_matrix.size > 0:
-            det_ids = []
-            track_ids = []
-            current_min = distance_matrix.min()
-
-            # This part should be vectorized
-            while current_min < self._distance_threshold:
-                # Get the index of minimum values
-                flattened_arg_min = distance_matrix.argmin()
-
-                # Find index of detections
-                det_idx = flattened_arg_min // distance_matrix.shape[1]
-
-                # Find index of tracks
-                track_idx = flattened_arg_min % distance_matrix.shape[1]
-
-                det_ids.append(det_idx)
-                track_ids.append(track_idx)
-                distance_matrix[det_idx, :] = self._distance_threshold + 1
-                distance_matrix[:, track_idx] = self._distance_threshold + 1
-                current_min = distance_matrix.min()
+            # Exact assignment in native code; rectangular matrices
+            # are handled directly, no padding needed
+            det_ids, track_ids = linear_sum_assignment(distance_matrix)
 
-            return det_ids, track_ids
+            # Keep only the pairs within the distance threshold
+            mask = distance_matrix[det_ids, track_ids] < self._distance_threshold
+            return list(det_ids[mask]), list(track_ids[mask])
         else:
             return [], []
@@ -1,6 +1,7 @@
 import os
 import cv2
 import logging
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -12,39 +13,68 @@ class VideoReader:
 
     Args:
         filename: Name of the file
+        hw_accel: Request hardware decode from the ffmpeg backend
     """
 
-    def __init__(self, filename):
+    def __init__(self, filename, hw_accel=True):
         self._filename = filename
 
         # Check if the file is exists, if not raise error
         if not os.path.exists(self._filename):
             raise FileNotFoundError("Could not find the file:{}".format(self._filename))
 
-        # Create a VideoCapture object to read frames from file
-        self._reader = cv2.VideoCapture(self._filename)
+        # Create a VideoCapture object to read frames from file,
+        # pinned to the ffmpeg backend and asking it to route the
+        # decode through the platform video engine. Older OpenCV
+        # builds without the acceleration parameters fall back to
+        # the default software path.
+        self._reader = None
+        if hw_accel:
+            try:
+                self._reader = cv2.VideoCapture(
+                    self._filename, cv2.CAP_FFMPEG,
+                    [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY])
+            except (AttributeError, TypeError):
+                logger.debug("Hardware accelerated decode not supported "
+                             "by this OpenCV build")
+                self._reader = None
+        if self._reader is None or not self._reader.isOpened():
+            self._reader = cv2.VideoCapture(self._filename)
         if not self._reader.isOpened():
             raise IOError("File can not opened.")
 
-        # Read the first frame to get frame props
-        ok, frame = self.read(0)
-        if ok:
-            self._width = frame.shape[1]
-            self._height = frame.shape[0]
-            self._channels = frame.shape[2]
-        else:
-            raise IOError(f'cannot read frame from {self._filename}.')
-
-        # Reset to first frame
-        self._seek(0)
+        # Container metadata is immutable for a given file; query
+        # the backend once instead of crossing into ffmpeg on every
+        # property access
+        self._frames_count = int(self._reader.get(cv2.CAP_PROP_FRAME_COUNT))
+        self._fps = float(self._reader.get(cv2.CAP_PROP_FPS))
+        self._fourcc = int(self._reader.get(cv2.CAP_PROP_FOURCC))
+
+        # Frame geometry from container metadata, no decode needed.
+        # Some containers report zero; only then decode one probe
+        # frame and seek back.
+        self._width = int(self._reader.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self._height = int(self._reader.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self._channels = 3
+        if self._width == 0 or self._height == 0:
+            ok, frame = self.read(0)
+            if not ok:
+                raise IOError(f'cannot read frame from {self._filename}.')
+            self._height, self._width, self._channels = frame.shape
+
+            # Reset to first frame
+            self._seek(0)
+
+        # Reused decode target for read_into, allocated on first use
+        self._scratch = None
 
     @property
     def frames_count(self):
-        return self._reader.get(cv2.CAP_PROP_FRAME_COUNT)
+        return self._frames_count
 
     @property
     def fps(self):
-        return self._reader.get(cv2.CAP_PROP_FPS)
+        return self._fps
 
     @property
     def current_frame_pos(self):
@@ -52,15 +82,15 @@ class VideoReader:
 
     @property
     def frame_width(self):
-        return int(self._reader.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        return self._width
 
     @property
     def frame_height(self):
-        return int(self._reader.get(cv2.CAP_PROP_FRAME_WIDTH))
+        return self._height
 
     @property
     def fourcc(self):
-        return int(self._reader.get(cv2.CAP_PROP_FOURCC))
+        return self._fourcc
 
     @property
     def frame_format(self):
@@ -80,16 +110,69 @@ class VideoReader:
 
         return success, frame
 
+    def get_frame_umat(self, idx: int) -> tuple:
+        """
+        Gets a frame like get_frame but wrapped in a cv2.UMat, so
+        downstream OpenCV operations (cvtColor, resize) can run on
+        the OpenCL device without re-uploading the frame per call.
+
+        Args:
+            idx: Index number of the frame
+
+        Returns:
+            success and the frame as cv2.UMat
+        """
+        success, frame = self.get_frame(idx)
+        return success, cv2.UMat(frame)
+
     # Reads the next frame from the video file
-    def read(self, frame_number=None):
-        """Read next frame or frame specified by `frame_number`."""
+    def read(self, frame_number=None, grayscale=False):
+        """
+        Read next frame or frame specified by `frame_number`.
+
+        With grayscale the frame is converted to a single channel
+        [height, width, 1] array. The conversion output is
+        contiguous, unlike slicing one channel out of a BGR frame
+        which leaves a strided view that every later copy has to
+        gather byte by byte.
+        """
 
         # Check if we are at right position if seek the frame
         if frame_number is not None and not frame_number == self.current_frame_pos:
             self._seek(frame_number)
 
         # Read frame from reader and return it
-        return self._reader.read()
+        success, frame = self._reader.read()
+        if success and grayscale:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)[:, :, np.newaxis]
+        return success, frame
+
+    def read_into(self, buf, frame_number=None) -> bool:
+        """
+        Reads the next frame (or `frame_number`) as grayscale into
+        a preallocated [height, width, 1] buffer. Nothing is
+        allocated per frame: the decode lands in a reused scratch
+        frame and the grayscale conversion writes straight into
+        the caller's buffer.
+
+        Args:
+            buf: Target buffer of shape [height, width, 1] uint8
+            frame_number: Optional frame index to seek to first
+
+        Returns:
+            True when a frame was read
+        """
+        if frame_number is not None and not frame_number == self.current_frame_pos:
+            self._seek(frame_number)
+
+        if self._scratch is None:
+            self._scratch = np.empty((self._height, self._width, self._channels),
+                                     dtype=np.uint8)
+
+        success, _ = self._reader.read(self._scratch)
+        if success:
+            cv2.cvtColor(self._scratch, cv2.COLOR_BGR2GRAY, dst=buf[:, :, 0])
+        return success
 
     def _seek(self, frame_number):
         """Set the frame number to seek in video."""
@@ -103,12 +186,31 @@ class VideoReader:
         self.__init__(self._filename)
 
     def close(self):
-        self._reader.release()
+        """Releases the capture; safe to call more than once."""
+        if self._reader is not None:
+            self._reader.release()
+            self._reader = None
+
+    def _read_sequential(self, start, stop):
+        """Yields the frames [start, stop) with a single seek."""
+        self._seek(start)
+        for _ in range(start, stop):
+            success, frame = self._reader.read()
+            if not success:
+                return
+            yield frame
 
     def __getitem__(self, index):
         """Enables slicing self[index] and self[start:stop:step]"""
         if isinstance(index, slice):
-            return (self[ii] for ii in range(*index.indices(len(self))))
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                # Contiguous slice: seek once and read sequentially.
+                # A per-frame position set re-decodes from the
+                # nearest keyframe on most codecs, so it costs up to
+                # a GOP of work per frame.
+                return self._read_sequential(start, stop)
+            return (self[ii] for ii in range(start, stop, step))
         elif isinstance(index, (list, tuple, range)):
             return (self[ii] for ii in index)
         else:
@@ -121,7 +223,7 @@ class VideoReader:
     def __enter__(self):
         return self
 
-    def __exit__(self):
+    def __exit__(self, exc_type, exc, tb):
         self.close()
 
     def __repr__(self):